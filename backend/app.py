@@ -8,6 +8,8 @@ from routes.generation import generation_bp
 from routes.usage import usage_bp
 from routes.videos import video_bp
 from routes.frontend import frontend_bp
+from services.retention_service import start_retention_worker
+from services.reconcile_service import start_reconciler
 
 app = Flask(__name__)
 
@@ -21,6 +23,9 @@ app.register_blueprint(usage_bp)
 app.register_blueprint(video_bp)
 app.register_blueprint(frontend_bp)
 
+start_retention_worker()
+start_reconciler()
+
 @app.route('/videos/<path:path>')
 def serve_video(path):
     return send_from_directory(OUTPUT_DIR, path)
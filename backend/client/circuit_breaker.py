@@ -0,0 +1,93 @@
+import threading
+import time
+from typing import Any, Dict
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float, max_reset_seconds: float):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.base_reset_seconds = reset_seconds
+        self.max_reset_seconds = max(reset_seconds, max_reset_seconds)
+        self.reset_seconds = reset_seconds
+        self.state = CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._probe_started = None
+        self._lock = threading.Lock()
+
+    def _open(self, now: float):
+        self.state = OPEN
+        self._opened_at = now
+        self._probe_started = None
+        self.trips += 1
+        print(f"🔌 {self.name}: circuit opened for {self.reset_seconds:.0f}s after {self.failures} failures")
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            now = time.monotonic()
+            if self.state == OPEN and now - self._opened_at >= self.reset_seconds:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and (self._probe_started is None or now - self._probe_started >= self.reset_seconds):
+                self._probe_started = now
+                return True
+            self.rejected += 1
+            return False
+
+    def is_open(self) -> bool:
+        with self._lock:
+            return self.state == OPEN and time.monotonic() - self._opened_at < self.reset_seconds
+
+    def check(self):
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} is unavailable (circuit open)")
+
+    def check_still_closed(self):
+        if self.is_open():
+            raise CircuitOpenError(f"{self.name} is unavailable (circuit open)")
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                print(f"✅ {self.name}: circuit closed, provider recovered")
+            self.state = CLOSED
+            self.failures = 0
+            self.reset_seconds = self.base_reset_seconds
+            self._probe_started = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            now = time.monotonic()
+            if self.state == HALF_OPEN:
+                self.reset_seconds = min(self.max_reset_seconds, self.reset_seconds * 2)
+                self._open(now)
+            elif self.state == CLOSED and self.failures >= self.failure_threshold:
+                self._open(now)
+
+    def record_status(self, status_code: int):
+        if status_code >= 500 or status_code == 429:
+            self.record_failure()
+        else:
+            self.record_success()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            reopens_in = self.reset_seconds - (time.monotonic() - self._opened_at) if self.state == OPEN else 0.0
+            return {
+                "state": self.state,
+                "failures": self.failures,
+                "trips": self.trips,
+                "rejected": self.rejected,
+                "retry_in": round(max(0.0, reopens_in), 1),
+            }
@@ -0,0 +1,91 @@
+import hashlib
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+
+from client import http_client
+from client.circuit_breaker import CircuitBreaker
+from config import (
+    ELEVENLABS_API_KEY, ELEVENLABS_API_BASE, ELEVENLABS_MAX_CONCURRENCY, RETRY_ATTEMPTS, TTS_CACHE_MAX_BYTES,
+    VOICES_CACHE_FRESH_SECONDS, USAGE_CACHE_FRESH_SECONDS, METADATA_REFRESH_RETRY_SECONDS, METADATA_COLD_WAIT_SECONDS,
+    CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS, CIRCUIT_MAX_RESET_SECONDS
+)
+from utils.disk_cache import DiskCache, SingleFlight, StaleWhileRevalidate
+
+ELEVENLABS_API_URL = f"{ELEVENLABS_API_BASE}/v1"
+
+_account_slots = threading.BoundedSemaphore(ELEVENLABS_MAX_CONCURRENCY)
+elevenlabs_breaker = CircuitBreaker("ElevenLabs", CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS, CIRCUIT_MAX_RESET_SECONDS)
+_tts_cache = DiskCache("tts", max_bytes=TTS_CACHE_MAX_BYTES)
+_tts_flight = SingleFlight()
+_voices_cache = StaleWhileRevalidate("voices", VOICES_CACHE_FRESH_SECONDS, METADATA_REFRESH_RETRY_SECONDS)
+_usage_cache = StaleWhileRevalidate("elevenlabs_usage", USAGE_CACHE_FRESH_SECONDS, METADATA_REFRESH_RETRY_SECONDS)
+
+
+def synthesize(text: str, voice_id: str, model_id: str, previous_text: Optional[str] = None, next_text: Optional[str] = None) -> bytes:
+    payload = {"text": text, "model_id": model_id}
+    if previous_text:
+        payload["previous_text"] = previous_text
+    if next_text:
+        payload["next_text"] = next_text
+
+    headers = {"xi-api-key": ELEVENLABS_API_KEY, "accept": "audio/mpeg"}
+    url = f"{ELEVENLABS_API_URL}/text-to-speech/{voice_id}"
+
+    for attempt in range(RETRY_ATTEMPTS):
+        elevenlabs_breaker.check()
+        try:
+            with _account_slots:
+                elevenlabs_breaker.check_still_closed()
+                response = http_client.post(url, headers=headers, json=payload, timeout=120, retries=0)
+            elevenlabs_breaker.record_status(response.status_code)
+            response.raise_for_status()
+            if not response.content:
+                raise requests.exceptions.RequestException("ElevenLabs returned empty audio")
+            return response.content
+        except requests.exceptions.HTTPError as e:
+            status = e.response.status_code
+            if status not in http_client.RETRY_STATUS_CODES or attempt == RETRY_ATTEMPTS - 1:
+                raise
+            time.sleep(http_client.backoff_delay(attempt, e.response))
+        except requests.exceptions.RequestException as e:
+            if isinstance(e, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+                elevenlabs_breaker.record_failure()
+            if attempt == RETRY_ATTEMPTS - 1:
+                raise
+            time.sleep(http_client.backoff_delay(attempt))
+
+
+def tts_cache_key(text: str, voice_id: str, model_id: str) -> str:
+    return DiskCache.make_key(hashlib.sha256(text.encode('utf-8')).hexdigest(), voice_id, model_id)
+
+
+def synthesize_cached(text: str, voice_id: str, model_id: str, previous_text: Optional[str] = None, next_text: Optional[str] = None) -> Tuple[Path, str]:
+    key = tts_cache_key(text, voice_id, model_id)
+
+    def fetch() -> Path:
+        cached = _tts_cache.get_path(key, ".mp3")
+        if cached is not None:
+            return cached
+        audio = synthesize(text, voice_id, model_id, previous_text=previous_text, next_text=next_text)
+        return _tts_cache.set_bytes(key, audio, ".mp3")
+
+    return _tts_flight.do(key, fetch), key
+
+
+def _fetch_account_json(path: str) -> Dict[str, Any]:
+    headers = {"xi-api-key": ELEVENLABS_API_KEY}
+    response = http_client.get(f"{ELEVENLABS_API_URL}{path}", headers=headers, timeout=5, retries=0)
+    response.raise_for_status()
+    return response.json()
+
+
+def get_voices() -> Optional[Dict[str, Any]]:
+    return _voices_cache.get("voices", lambda: _fetch_account_json("/voices"), METADATA_COLD_WAIT_SECONDS)
+
+
+def get_subscription() -> Optional[Dict[str, Any]]:
+    return _usage_cache.get("subscription", lambda: _fetch_account_json("/user/subscription"), METADATA_COLD_WAIT_SECONDS)
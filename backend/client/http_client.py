@@ -0,0 +1,162 @@
+import asyncio
+import random
+import threading
+import time
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import (
+    HTTP_POOL_SIZE, HTTP_MAX_INFLIGHT_PER_HOST, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT,
+    HTTP_RETRIES, HTTP_BACKOFF_SECONDS, HTTP_MAX_RETRY_AFTER_SECONDS
+)
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+_sessions: Dict[str, requests.Session] = {}
+_host_slots: Dict[str, threading.BoundedSemaphore] = {}
+_registry_lock = threading.Lock()
+_async_host_slots: Dict[str, asyncio.Semaphore] = {}
+
+
+def _host_key(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _get_session(host: str) -> requests.Session:
+    with _registry_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE, max_retries=0)
+            session.mount(f"{host}/", adapter)
+            _sessions[host] = session
+            _host_slots[host] = threading.BoundedSemaphore(HTTP_MAX_INFLIGHT_PER_HOST)
+        return session
+
+
+def _normalize_timeout(timeout):
+    if timeout is None:
+        return (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+    if isinstance(timeout, (int, float)):
+        return (min(HTTP_CONNECT_TIMEOUT, timeout), timeout)
+    return timeout
+
+
+def retry_after_seconds(response) -> Optional[float]:
+    if response is None:
+        return None
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return max(0.0, min(seconds, HTTP_MAX_RETRY_AFTER_SECONDS))
+
+
+def backoff_delay(attempt: int, response=None) -> float:
+    retry_after = retry_after_seconds(response)
+    if retry_after is not None:
+        return retry_after
+    return HTTP_BACKOFF_SECONDS * (2 ** attempt) * (1 + random.random() * 0.25)
+
+
+def _send(method: str, url: str, retries: int, **kwargs) -> requests.Response:
+    host = _host_key(url)
+    session = _get_session(host)
+    slot = _host_slots[host]
+    kwargs["timeout"] = _normalize_timeout(kwargs.get("timeout"))
+
+    for attempt in range(retries + 1):
+        response = None
+        with slot:
+            try:
+                response = session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt == retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUS_CODES or attempt == retries:
+                    return response
+                response.close()
+        time.sleep(backoff_delay(attempt, response))
+
+    raise requests.exceptions.RetryError(f"Retries exhausted for {url}")
+
+
+def request(method: str, url: str, retries: int = HTTP_RETRIES, **kwargs) -> requests.Response:
+    return _send(method, url, retries, **kwargs)
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+def create_async_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=None, max_keepalive_connections=HTTP_POOL_SIZE),
+        timeout=httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+        follow_redirects=True
+    )
+
+
+def _async_slot(url: str) -> asyncio.Semaphore:
+    host = _host_key(url)
+    slot = _async_host_slots.get(host)
+    if slot is None:
+        slot = _async_host_slots[host] = asyncio.Semaphore(HTTP_MAX_INFLIGHT_PER_HOST)
+    return slot
+
+
+async def async_request(client: httpx.AsyncClient, method: str, url: str, retries: int = HTTP_RETRIES, **kwargs) -> httpx.Response:
+    slot = _async_slot(url)
+
+    for attempt in range(retries + 1):
+        response = None
+        async with slot:
+            try:
+                response = await client.request(method, url, **kwargs)
+            except httpx.TransportError:
+                if attempt == retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUS_CODES or attempt == retries:
+                    return response
+        await asyncio.sleep(backoff_delay(attempt, response))
+
+    raise httpx.HTTPError(f"Retries exhausted for {url}")
+
+
+@asynccontextmanager
+async def async_stream(client: httpx.AsyncClient, method: str, url: str, retries: int = HTTP_RETRIES, **kwargs) -> AsyncIterator[httpx.Response]:
+    yielded = False
+    async with _async_slot(url):
+        for attempt in range(retries + 1):
+            try:
+                async with client.stream(method, url, **kwargs) as response:
+                    if response.status_code in RETRY_STATUS_CODES and attempt < retries:
+                        delay = backoff_delay(attempt, response)
+                    else:
+                        yielded = True
+                        yield response
+                        return
+            except httpx.TransportError:
+                if yielded or attempt == retries:
+                    raise
+                delay = backoff_delay(attempt)
+            await asyncio.sleep(delay)
@@ -1,3 +1,102 @@
+import threading
+import time
+from typing import Any, Dict, Iterator
+
 from openai import OpenAI
 
-client = OpenAI()
\ No newline at end of file
+from config import LLM_CACHE_MODE, LLM_CACHE_SITES, LLM_CACHE_MAX_BYTES
+from utils.disk_cache import DiskCache, SingleFlight
+
+client = OpenAI()
+
+_response_cache = DiskCache("llm", max_bytes=LLM_CACHE_MAX_BYTES)
+_flight = SingleFlight()
+_stats_lock = threading.Lock()
+_site_stats: Dict[str, Dict[str, int]] = {}
+
+
+class LLMReplayMiss(RuntimeError):
+    pass
+
+
+def _count(call_site: str, outcome: str):
+    with _stats_lock:
+        site = _site_stats.setdefault(call_site, {"hits": 0, "misses": 0, "bypassed": 0})
+        site[outcome] += 1
+
+
+def _complete(params: Dict[str, Any]) -> str:
+    response = client.chat.completions.create(**params)
+    return (response.choices[0].message.content or "").strip()
+
+
+def _bypasses_cache(call_site: str) -> bool:
+    return LLM_CACHE_MODE == 'off' or (LLM_CACHE_MODE == 'on' and call_site not in LLM_CACHE_SITES)
+
+
+def _store(key: str, call_site: str, params: Dict[str, Any], content: str):
+    if content:
+        _response_cache.set_json(key, {
+            "call_site": call_site,
+            "model": params.get("model"),
+            "content": content,
+            "recorded_at": int(time.time())
+        })
+
+
+def chat_completion(call_site: str, **params) -> str:
+    if _bypasses_cache(call_site):
+        _count(call_site, "bypassed")
+        return _complete(params)
+
+    key = DiskCache.make_key("chat", params)
+
+    def fetch() -> str:
+        if LLM_CACHE_MODE != 'record':
+            cached = _response_cache.get_json(key)
+            if cached is not None:
+                _count(call_site, "hits")
+                return cached["content"]
+
+        _count(call_site, "misses")
+        if LLM_CACHE_MODE == 'replay':
+            raise LLMReplayMiss(f"No recorded LLM response for {call_site} ({params.get('model')})")
+
+        content = _complete(params)
+        _store(key, call_site, params, content)
+        return content
+
+    return _flight.do(key, fetch)
+
+
+def stream_chat_completion(call_site: str, **params) -> Iterator[str]:
+    caching = not _bypasses_cache(call_site)
+    key = DiskCache.make_key("chat", params)
+
+    if not caching:
+        _count(call_site, "bypassed")
+    elif LLM_CACHE_MODE != 'record':
+        cached = _response_cache.get_json(key)
+        if cached is not None:
+            _count(call_site, "hits")
+            yield cached["content"]
+            return
+    if caching:
+        _count(call_site, "misses")
+        if LLM_CACHE_MODE == 'replay':
+            raise LLMReplayMiss(f"No recorded LLM response for {call_site} ({params.get('model')})")
+
+    parts = []
+    for chunk in client.chat.completions.create(stream=True, **params):
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if delta:
+            parts.append(delta)
+            yield delta
+
+    if caching:
+        _store(key, call_site, params, ''.join(parts).strip())
+
+
+def llm_cache_stats() -> Dict[str, Any]:
+    with _stats_lock:
+        return {"mode": LLM_CACHE_MODE, "sites": {site: dict(counts) for site, counts in _site_stats.items()}}
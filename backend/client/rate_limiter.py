@@ -0,0 +1,204 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, AsyncIterator, Optional
+
+from client.http_client import retry_after_seconds
+
+THROTTLE_PAUSE_SECONDS = 1.0
+
+
+class _Waiter:
+    __slots__ = ("job_id", "notify", "granted", "abandoned")
+
+    def __init__(self, job_id: str, notify: Callable[[], None]):
+        self.job_id = job_id
+        self.notify = notify
+        self.granted = False
+        self.abandoned = False
+
+
+class Permit:
+    def __init__(self, started: float):
+        self.started = started
+        self.status_code: Optional[int] = None
+        self.retry_after: Optional[float] = None
+
+    def observe(self, response):
+        self.status_code = response.status_code
+        self.retry_after = retry_after_seconds(response)
+
+
+class AdaptiveRateLimiter:
+    def __init__(self, name: str, rate_per_second: float, burst: int, min_concurrency: int,
+                 max_concurrency: int, initial_concurrency: int, target_latency: float):
+        self.name = name
+        self.rate = rate_per_second
+        self.burst = max(1, burst)
+        self.min_concurrency = max(1, min_concurrency)
+        self.max_concurrency = max(self.min_concurrency, max_concurrency)
+        self.target_latency = target_latency
+        self.concurrency = float(min(max(initial_concurrency, self.min_concurrency), self.max_concurrency))
+        self.tokens = float(self.burst)
+        self.inflight = 0
+        self.paused_until = 0.0
+        self.granted = 0
+        self.throttled = 0
+        self._last_refill = time.monotonic()
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+        self._waiters: "OrderedDict[str, Deque[_Waiter]]" = OrderedDict()
+        self._timer: Optional[threading.Timer] = None
+        self._timer_due = 0.0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def _enqueue(self, waiter: _Waiter):
+        self._waiters.setdefault(waiter.job_id, deque()).append(waiter)
+
+    def _next_waiter(self) -> Optional[_Waiter]:
+        while self._waiters:
+            job_id, queue = next(iter(self._waiters.items()))
+            waiter = queue.popleft()
+            if queue:
+                self._waiters.move_to_end(job_id)
+            else:
+                del self._waiters[job_id]
+            if not waiter.abandoned:
+                return waiter
+        return None
+
+    def _arm_timer(self, now: float, delay: float) -> float:
+        due = now + delay
+        if self._timer is None or due < self._timer_due:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(delay, self._on_timer)
+            self._timer.daemon = True
+            self._timer_due = due
+            self._timer.start()
+        return delay
+
+    def _on_timer(self):
+        with self._lock:
+            self._timer = None
+            self._dispatch()
+
+    def _dispatch(self) -> Optional[float]:
+        now = time.monotonic()
+        self._refill(now)
+        while self._waiters and self.inflight < int(self.concurrency):
+            if now < self.paused_until:
+                return self._arm_timer(now, self.paused_until - now)
+            if self.tokens < 1:
+                return self._arm_timer(now, (1 - self.tokens) / self.rate)
+            waiter = self._next_waiter()
+            if waiter is None:
+                break
+            self.tokens -= 1
+            self.inflight += 1
+            self.granted += 1
+            waiter.granted = True
+            waiter.notify()
+        return None
+
+    def _decrease(self, now: float, started: float):
+        if started < self._last_decrease:
+            return
+        self._last_decrease = now
+        self.concurrency = max(self.min_concurrency, self.concurrency / 2)
+        print(f"⚠️ {self.name}: backing off to {int(self.concurrency)} concurrent requests")
+
+    def _release(self, permit: Optional[Permit]):
+        with self._lock:
+            self.inflight -= 1
+            if permit is not None and permit.status_code is not None:
+                now = time.monotonic()
+                if permit.status_code == 429:
+                    self.throttled += 1
+                    pause = permit.retry_after if permit.retry_after is not None else THROTTLE_PAUSE_SECONDS
+                    self.paused_until = max(self.paused_until, now + pause)
+                    self._decrease(now, permit.started)
+                elif permit.status_code < 400:
+                    if now - permit.started > self.target_latency:
+                        self._decrease(now, permit.started)
+                    else:
+                        self.concurrency = min(self.max_concurrency, self.concurrency + 1 / self.concurrency)
+            self._dispatch()
+
+    def acquire(self, job_id: str) -> Permit:
+        wakeup = threading.Event()
+        waiter = _Waiter(job_id, wakeup.set)
+        with self._lock:
+            self._enqueue(waiter)
+            delay = self._dispatch()
+
+        while True:
+            wakeup.wait(timeout=delay)
+            wakeup.clear()
+            with self._lock:
+                if waiter.granted:
+                    return Permit(time.monotonic())
+                delay = self._dispatch()
+                if waiter.granted:
+                    return Permit(time.monotonic())
+
+    async def acquire_async(self, job_id: str) -> Permit:
+        loop = asyncio.get_running_loop()
+        wakeup = asyncio.Event()
+        waiter = _Waiter(job_id, lambda: loop.call_soon_threadsafe(wakeup.set))
+        with self._lock:
+            self._enqueue(waiter)
+            delay = self._dispatch()
+
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                wakeup.clear()
+                with self._lock:
+                    if waiter.granted:
+                        return Permit(time.monotonic())
+                    delay = self._dispatch()
+                    if waiter.granted:
+                        return Permit(time.monotonic())
+        except asyncio.CancelledError:
+            with self._lock:
+                waiter.abandoned = True
+                granted = waiter.granted
+            if granted:
+                self._release(None)
+            raise
+
+    @contextmanager
+    def slot(self, job_id: str) -> Iterator[Permit]:
+        permit = self.acquire(job_id)
+        try:
+            yield permit
+        finally:
+            self._release(permit)
+
+    @asynccontextmanager
+    async def async_slot(self, job_id: str) -> AsyncIterator[Permit]:
+        permit = await self.acquire_async(job_id)
+        try:
+            yield permit
+        finally:
+            self._release(permit)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "concurrency": int(self.concurrency),
+                "inflight": self.inflight,
+                "waiting": sum(len(queue) for queue in self._waiters.values()),
+                "granted": self.granted,
+                "throttled": self.throttled,
+                "paused_for": round(max(0.0, self.paused_until - time.monotonic()), 2),
+            }
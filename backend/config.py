@@ -13,6 +13,10 @@ PIXABAY_API_KEY = os.getenv('PIXABAY_API_KEY')
 UNSPLASH_API_KEY = os.getenv('UNSPLASH_API_KEY')
 STABILITY_API_KEY = os.getenv('STABILITY_API_KEY')
 
+PEXELS_API_BASE = os.getenv('PEXELS_API_BASE', 'https://api.pexels.com').rstrip('/')
+ELEVENLABS_API_BASE = os.getenv('ELEVENLABS_API_BASE', 'https://api.elevenlabs.io').rstrip('/')
+STABILITY_API_BASE = os.getenv('STABILITY_API_BASE', 'https://api.stability.ai').rstrip('/')
+
 VIDEO_WIDTH = 1920
 VIDEO_HEIGHT = 1080
 FPS = 30
@@ -22,10 +26,46 @@ INTRO_CLIP_DURATION = 7.0
 MAX_IMAGE_WORKERS = 8
 MAX_DOWNLOAD_WORKERS = 8
 RETRY_ATTEMPTS = 3
-IMAGE_BUFFER_COUNT = 3
+
+ACQUISITION_MAX_SEARCHES = int(os.getenv('ACQUISITION_MAX_SEARCHES', '8'))
+ACQUISITION_MAX_DOWNLOADS = int(os.getenv('ACQUISITION_MAX_DOWNLOADS', str(MAX_DOWNLOAD_WORKERS * 2)))
+
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '5'))
+CIRCUIT_RESET_SECONDS = float(os.getenv('CIRCUIT_RESET_SECONDS', '30'))
+CIRCUIT_MAX_RESET_SECONDS = 300
+AI_FALLBACK_MODE = os.getenv('AI_FALLBACK_MODE', 'stock').lower()
+STOCK_FALLBACK_MODE = os.getenv('STOCK_FALLBACK_MODE', 'cached').lower()
+FALLBACK_VARIANT = os.getenv('FALLBACK_VARIANT', 'still').lower()
+FALLBACK_CLIP_SECONDS = float(os.getenv('FALLBACK_CLIP_SECONDS', '6'))
+
+STABILITY_RATE_PER_SECOND = float(os.getenv('STABILITY_RATE_PER_SECOND', '15'))
+STABILITY_BURST = int(os.getenv('STABILITY_BURST', '10'))
+STABILITY_MIN_CONCURRENCY = 1
+STABILITY_MAX_CONCURRENCY = int(os.getenv('STABILITY_MAX_CONCURRENCY', str(MAX_IMAGE_WORKERS * 2)))
+STABILITY_INITIAL_CONCURRENCY = int(os.getenv('STABILITY_INITIAL_CONCURRENCY', str(MAX_IMAGE_WORKERS // 2)))
+STABILITY_TARGET_LATENCY_SECONDS = float(os.getenv('STABILITY_TARGET_LATENCY_SECONDS', '30'))
+
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', str(max(MAX_IMAGE_WORKERS, MAX_DOWNLOAD_WORKERS) * 2)))
+HTTP_MAX_INFLIGHT_PER_HOST = int(os.getenv('HTTP_MAX_INFLIGHT_PER_HOST', str(HTTP_POOL_SIZE)))
+HTTP_CONNECT_TIMEOUT = 5.0
+HTTP_READ_TIMEOUT = 30.0
+HTTP_RETRIES = 2
+HTTP_BACKOFF_SECONDS = 0.5
+HTTP_MAX_RETRY_AFTER_SECONDS = 30.0
 
 SCRIPT_CHUNK_LIMIT = 9500
+TTS_CHUNK_TARGET_CHARS = int(os.getenv('TTS_CHUNK_TARGET_CHARS', '1200'))
+ELEVENLABS_MAX_CONCURRENCY = int(os.getenv('ELEVENLABS_MAX_CONCURRENCY', '4'))
+NARRATION_TARGET_PEAK = 0.9
+NORMALIZE_BLOCK_SAMPLES = 65536
+NARRATION_ANALYSIS_WINDOW_SECONDS = 0.01
+PAUSE_MIN_SECONDS = 0.2
+PAUSE_THRESHOLD_DB = -30
+TIMELINE_SNAP_TOLERANCE = 0.35
 MAX_SCRIPT_RETRIES = 3
+STRUCTURED_GENERATION = os.getenv('STRUCTURED_GENERATION', 'false').lower() == 'true'
+PACKAGE_IMAGE_PROMPT_COUNT = 12
+STREAMING_NARRATION = os.getenv('STREAMING_NARRATION', 'false').lower() == 'true'
 
 IS_MAC = platform.processor() == 'arm' and platform.system() == 'Darwin'
 IS_RAILWAY = os.getenv('RAILWAY_ENVIRONMENT', 'false').lower() == 'true'
@@ -46,12 +86,52 @@ else:
 CACHE_DIR = Path(os.getenv('CACHE_DIR', 'cache'))
 CACHE_DIR.mkdir(exist_ok=True)
 
+PEXELS_SEARCH_CACHE_TTL = int(os.getenv('PEXELS_SEARCH_CACHE_TTL', str(24 * 3600)))
+PEXELS_SEARCH_CACHE_MAX_BYTES = int(os.getenv('PEXELS_SEARCH_CACHE_MAX_MB', '64')) * 1024 * 1024
+
+LLM_CACHE_MODE = os.getenv('LLM_CACHE_MODE', 'on').lower()
+LLM_CACHE_SITES = {site.strip() for site in os.getenv('LLM_CACHE_SITES', 'keywords,metadata').split(',') if site.strip()}
+LLM_CACHE_MAX_BYTES = int(os.getenv('LLM_CACHE_MAX_MB', '256')) * 1024 * 1024
+
+TTS_CACHE_MAX_BYTES = int(os.getenv('TTS_CACHE_MAX_MB', '1024')) * 1024 * 1024
+STABILITY_IMAGE_CACHE_MAX_BYTES = int(os.getenv('STABILITY_IMAGE_CACHE_MAX_MB', '2048')) * 1024 * 1024
+VOICE_PREVIEW_MAX_AGE_SECONDS = 7 * 24 * 3600
+
+VOICES_CACHE_FRESH_SECONDS = int(os.getenv('VOICES_CACHE_FRESH_SECONDS', '3600'))
+USAGE_CACHE_FRESH_SECONDS = int(os.getenv('USAGE_CACHE_FRESH_SECONDS', '60'))
+METADATA_REFRESH_RETRY_SECONDS = 30
+METADATA_COLD_WAIT_SECONDS = float(os.getenv('METADATA_COLD_WAIT_SECONDS', '1.0'))
+
+STOCK_MIN_VIDEO_WIDTH = int(os.getenv('STOCK_MIN_VIDEO_WIDTH', '1280'))
+STOCK_PARTIAL_DOWNLOADS = os.getenv('STOCK_PARTIAL_DOWNLOADS', 'true').lower() == 'true'
+STOCK_PARTIAL_MIN_RATIO = 1.5
+STOCK_WINDOW_PADDING_SECONDS = 1.0
+STOCK_TRIM_TIMEOUT_SECONDS = 60
+STOCK_MIN_KEYWORD_DIVERSITY = int(os.getenv('STOCK_MIN_KEYWORD_DIVERSITY', '4'))
+
+ASSET_RETENTION_POLICY = os.getenv('ASSET_RETENTION_POLICY', 'keep').lower()
+RETENTION_IMAGE_FORMAT = os.getenv('RETENTION_IMAGE_FORMAT', 'webp').lower()
+RETENTION_IMAGE_QUALITY = int(os.getenv('RETENTION_IMAGE_QUALITY', '85'))
+RETENTION_MAX_AGE_DAYS = float(os.getenv('RETENTION_MAX_AGE_DAYS', '0'))
+RETENTION_MAX_STORAGE_GB = float(os.getenv('RETENTION_MAX_STORAGE_GB', '0'))
+RETENTION_INTERVAL_SECONDS = int(os.getenv('RETENTION_INTERVAL_SECONDS', '900'))
+RETENTION_THROTTLE_SECONDS = float(os.getenv('RETENTION_THROTTLE_SECONDS', '0.05'))
+
 OUTPUT_DIR = Path("youtube_videos")
 DATA_DIR = Path("data")
 DATA_DIR.mkdir(exist_ok=True)
 
 PROGRESS_FILE = DATA_DIR / "progress.json"
 GENERATING_VIDEOS_FILE = DATA_DIR / "generating_videos.json"
+PROGRESS_DB_FILE = DATA_DIR / "progress.db"
+PROGRESS_BACKEND = os.getenv('PROGRESS_BACKEND', 'sqlite').lower()
+
+HEARTBEAT_INTERVAL_SECONDS = int(os.getenv('HEARTBEAT_INTERVAL_SECONDS', '30'))
+HEARTBEAT_TIMEOUT_SECONDS = int(os.getenv('HEARTBEAT_TIMEOUT_SECONDS', '180'))
+RECONCILE_INTERVAL_SECONDS = int(os.getenv('RECONCILE_INTERVAL_SECONDS', '60'))
+RECONCILE_REQUEUE = os.getenv('RECONCILE_REQUEUE', 'false').lower() == 'true'
+RECONCILE_MAX_ATTEMPTS = int(os.getenv('RECONCILE_MAX_ATTEMPTS', '2'))
+ORPHAN_GRACE_SECONDS = int(os.getenv('ORPHAN_GRACE_SECONDS', '600'))
 
 ALLOWED_ORIGINS = os.getenv('ALLOWED_ORIGINS', 'http://localhost:3000,http://localhost:5002').split(',')
 
@@ -4,16 +4,20 @@ import time
 import shutil
 import gc
 import threading
+from dataclasses import asdict
 from pathlib import Path
 from threading import Lock
 
-from config import OUTPUT_DIR, MAX_CONCURRENT_VIDEOS
-from core.models import GenerationConfig, VideoSettings, ProgressUpdate, VideoGenerationError
-from services.script_service import generate_script, generate_youtube_metadata
+from config import OUTPUT_DIR, MAX_CONCURRENT_VIDEOS, HEARTBEAT_INTERVAL_SECONDS, STRUCTURED_GENERATION, STREAMING_NARRATION
+from core.models import GenerationConfig, VideoSettings, ProgressUpdate, VideoGenerationError, ScriptGenerationError, AudioGenerationError
+from services.script_service import generate_script, generate_youtube_metadata, generate_content_package, stream_script_paragraphs
 from services.asset_service import gather_visuals
-from services.audio_service import generate_voiceover
+from services.audio_service import generate_voiceover, generate_voiceover_streaming
 from services.render_service import render_video_simple, generate_thumbnail
-from repositories.progress_repository import mark_video_completed, add_generating_video, remove_generating_video
+from services.timeline_service import build_timeline
+from services.retention_service import schedule_compaction
+from services.stability_service import pop_image_cache_stats
+from repositories.progress_repository import mark_video_completed, add_generating_video, remove_generating_video, heartbeat_generating_video
 
 generation_progress = {}
 progress_lock = Lock()
@@ -27,6 +31,7 @@ class VideoGenerator:
         self.project_dir = OUTPUT_DIR / self.project_name
         self.video_settings = self._get_video_settings()
         self.progress_file = self.project_dir / ".progress.json"
+        self._registered = False
         self.setup_directories()
 
     def _sanitize_project_name(self, topic: str) -> str:
@@ -104,48 +109,88 @@ class VideoGenerator:
                     except:
                         pass
             
+            schedule_compaction(self.project_dir)
             gc.collect()
         except Exception as e:
             print(f"Error during post-success cleanup: {e}")
 
+    def _start_heartbeat(self) -> threading.Event:
+        stop_event = threading.Event()
+        owner = threading.current_thread()
+
+        def beat():
+            while not stop_event.wait(HEARTBEAT_INTERVAL_SECONDS) and owner.is_alive():
+                heartbeat_generating_video(self.project_name)
+
+        threading.Thread(target=beat, name=f"heartbeat-{self.project_name[:30]}", daemon=True).start()
+        return stop_event
+
+    def register(self):
+        if not self._registered:
+            add_generating_video(self.project_name, self.config.topic, self.config.progress_id, self.config.video_type, config=asdict(self.config))
+            self._registered = True
+
     def generate(self):
+        self.register()
+        heartbeat_stop = self._start_heartbeat()
         video_generation_semaphore.acquire()
         start_time = time.time()
         success = False
         error_msg = None
         
         try:
-            add_generating_video(self.project_name, self.config.topic, self.config.progress_id, self.config.video_type)
-            
             self.update_progress(ProgressUpdate(step="Generating script", percentage=10, details="Creating engaging narrative..."))
-            script = generate_script(self.config.video_type, self.config.category, self.config.topic, self.video_settings)
+            package = {}
+            if STRUCTURED_GENERATION:
+                package = generate_content_package(self.config.video_type, self.config.category, self.config.topic, self.video_settings) or {}
+            script = package.get("script")
+            audio_path = None
+
+            if not script and STREAMING_NARRATION:
+                try:
+                    self.update_progress(ProgressUpdate(step="Generating script", percentage=15, details="Writing and narrating paragraph by paragraph..."))
+                    paragraphs = stream_script_paragraphs(self.config.video_type, self.config.category, self.config.topic, self.video_settings)
+                    script, audio_path = generate_voiceover_streaming(paragraphs, self.project_dir, self.config.voice_id, self.video_settings.tts_model)
+                except (ScriptGenerationError, AudioGenerationError) as e:
+                    print(f"Streaming narration failed: {e}. Falling back to sequential generation.")
+                    script, audio_path = None, None
+
+            if not script:
+                script = generate_script(self.config.video_type, self.config.category, self.config.topic, self.video_settings)
             
             if not script or len(script) < 50:
                 raise VideoGenerationError("Generated script is too short or empty")
             
-            self.update_progress(ProgressUpdate(step="Generating voiceover", percentage=25, details="Creating professional narration..."))
-            audio_path = generate_voiceover(script, self.project_dir, self.config.video_type, self.config.voice_id, self.video_settings.tts_model)
+            if not audio_path:
+                self.update_progress(ProgressUpdate(step="Generating voiceover", percentage=25, details="Creating professional narration..."))
+                audio_path = generate_voiceover(script, self.project_dir, self.config.video_type, self.config.voice_id, self.video_settings.tts_model)
             
             if not audio_path or not Path(audio_path).exists():
                 raise VideoGenerationError("Audio generation failed")
 
+            timeline = build_timeline(audio_path, self.video_settings)
+            timeline.save(self.project_dir)
+            print(f"Timeline planned: {len(timeline)} clips over {timeline.duration:.1f}s")
+
             self.update_progress(ProgressUpdate(step="Gathering visuals", percentage=40, details="Finding perfect visuals..."))
-            assets = gather_visuals(self.config.generation_mode, self.config.video_type, self.config.category, script, self.config.topic, self.project_dir, audio_path, self.video_settings, self.config.ai_provider, self.config.style_preset)
+            assets = gather_visuals(self.config.generation_mode, self.config.video_type, self.config.category, script, self.config.topic, self.project_dir, timeline, self.config.ai_provider, self.config.style_preset, keywords=package.get("keywords"), image_prompts=package.get("image_prompts"))
             
             if not assets:
                 raise VideoGenerationError("No assets were found or generated")
+            timeline.assign(assets, self.project_dir)
+            timeline.save(self.project_dir)
 
             self.update_progress(ProgressUpdate(step="Rendering video", percentage=80, details="This can take several minutes..."))
-            video_path = render_video_simple(assets, audio_path, self.project_dir, self.video_settings)
+            video_path = render_video_simple(timeline, audio_path, self.project_dir)
             
             if not video_path or not Path(video_path).exists():
                 raise VideoGenerationError("Video rendering failed")
             
             self.update_progress(ProgressUpdate(step="Generating thumbnail", percentage=95, details="Creating eye-catching thumbnail..."))
-            generate_thumbnail(assets=assets, topic=self.config.topic, script=script, project_dir=self.project_dir, generation_mode=self.config.generation_mode, ai_provider=self.config.ai_provider, style_preset=self.config.style_preset)
+            generate_thumbnail(timeline=timeline, topic=self.config.topic, script=script, project_dir=self.project_dir, generation_mode=self.config.generation_mode, ai_provider=self.config.ai_provider, style_preset=self.config.style_preset)
             
             self.update_progress(ProgressUpdate(step="Generating metadata", percentage=98, details="Creating YouTube metadata..."))
-            metadata = generate_youtube_metadata(self.config.topic, script, self.config.video_type)
+            metadata = package.get("metadata") or generate_youtube_metadata(self.config.topic, script, self.config.video_type)
             metadata['original_topic'] = self.config.topic
 
             metadata_path = self.project_dir / "youtube_metadata.json"
@@ -164,11 +209,16 @@ class VideoGenerator:
             
         finally:
             duration = time.time() - start_time
+            image_stats = pop_image_cache_stats(self.project_name)
             
             if success:
                 try:
                     mark_video_completed(self.config.topic)
-                    self.update_progress(ProgressUpdate(step="Complete", percentage=100, status="completed", details=f"Generated in {duration:.1f}s"))
+                    details = f"Generated in {duration:.1f}s"
+                    if image_stats["hits"] or image_stats["misses"]:
+                        details += f", {image_stats['hits']}/{image_stats['hits'] + image_stats['misses']} AI images from cache"
+                        print(f"🖼️ Image cache: {image_stats['hits']} hits, {image_stats['misses']} generated")
+                    self.update_progress(ProgressUpdate(step="Complete", percentage=100, status="completed", details=details))
                     
                     time.sleep(5)
                     
@@ -195,6 +245,7 @@ class VideoGenerator:
                 self._cleanup_on_error()
                 self.update_progress(ProgressUpdate(step="Error", percentage=0, status="error", details=error_msg or "Unknown error occurred"))
             
+            heartbeat_stop.set()
             video_generation_semaphore.release()
             gc.collect()
 
@@ -12,6 +12,7 @@ class GenerationConfig:
     video_type: str = "standard"
     ai_provider: str = "stability"
     style_preset: str = "cinematic"
+    attempt: int = 1
 
 @dataclass
 class VideoSettings:
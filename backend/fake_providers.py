@@ -0,0 +1,397 @@
+import hashlib
+import io
+import json
+import os
+import random
+import re
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import quote
+
+import imageio_ffmpeg
+import numpy as np
+import requests
+from flask import Flask, Response, jsonify, request, send_file
+from PIL import Image
+
+FAKE_PROVIDER_PORT = int(os.getenv('FAKE_PROVIDER_PORT', '8765'))
+FAKE_PROVIDER_MODE = os.getenv('FAKE_PROVIDER_MODE', 'synthetic').lower()
+FAKE_PROVIDER_DIR = Path(os.getenv('FAKE_PROVIDER_DIR', 'fixtures'))
+FAKE_SEED = int(os.getenv('FAKE_SEED', '0'))
+FAKE_ERROR_RATE = float(os.getenv('FAKE_ERROR_RATE', '0'))
+FAKE_THROTTLE_RATE = float(os.getenv('FAKE_THROTTLE_RATE', '0'))
+
+UPSTREAMS = {
+    "pexels": "https://api.pexels.com",
+    "elevenlabs": "https://api.elevenlabs.io",
+    "stability": "https://api.stability.ai",
+    "openai": "https://api.openai.com",
+}
+
+# median seconds, lognormal sigma
+DEFAULT_LATENCY = {
+    "pexels": (0.25, 0.4),
+    "media": (0.4, 0.6),
+    "elevenlabs": (1.5, 0.4),
+    "stability": (6.0, 0.35),
+    "openai": (4.0, 0.5),
+}
+
+RECORDED_HEADERS = ('Content-Type', 'Retry-After')
+MEDIA_HOSTS = re.compile(r'https://(?:videos|images)\.pexels\.com/[^"\s]+')
+
+app = Flask(__name__)
+
+_rng = random.Random(FAKE_SEED)
+_rng_lock = threading.Lock()
+_media_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+def _parse_latency(provider: str) -> Tuple[float, float]:
+    value = os.getenv(f'FAKE_LATENCY_{provider.upper()}')
+    if not value:
+        return DEFAULT_LATENCY[provider]
+    median, _, sigma = value.partition(',')
+    return float(median), float(sigma or 0)
+
+
+LATENCY = {provider: _parse_latency(provider) for provider in DEFAULT_LATENCY}
+
+
+def _count(provider: str, outcome: str):
+    with _stats_lock:
+        counters = _stats.setdefault(provider, {"requests": 0, "errors": 0, "throttled": 0, "replay_misses": 0})
+        counters[outcome] += 1
+
+
+def _seed_for(*parts) -> int:
+    digest = hashlib.sha256(json.dumps([FAKE_SEED, *parts], sort_keys=True, default=str).encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big')
+
+
+def _fault_rate(kind: str, provider: str, default: float) -> float:
+    return float(os.getenv(f'FAKE_{kind}_RATE_{provider.upper()}', default))
+
+
+def _inject(provider: str) -> Optional[Response]:
+    median, sigma = LATENCY[provider]
+    throttle_rate = _fault_rate('THROTTLE', provider, FAKE_THROTTLE_RATE)
+    error_rate = _fault_rate('ERROR', provider, FAKE_ERROR_RATE)
+    with _rng_lock:
+        delay = median * _rng.lognormvariate(0, sigma) if sigma else median
+        roll = _rng.random()
+    time.sleep(delay)
+
+    if roll < throttle_rate:
+        _count(provider, "throttled")
+        response = jsonify({"error": "rate limited (injected)"})
+        response.status_code = 429
+        response.headers['Retry-After'] = '1'
+        return response
+    if roll < throttle_rate + error_rate:
+        _count(provider, "errors")
+        response = jsonify({"error": "upstream failure (injected)"})
+        response.status_code = 503
+        return response
+    return None
+
+
+def _request_key(provider: str) -> str:
+    if request.is_json:
+        body = request.get_json(silent=True)
+    elif request.form:
+        body = sorted(request.form.items(multi=True))
+    else:
+        body = hashlib.sha256(request.get_data()).hexdigest()
+    return hashlib.sha256(json.dumps(
+        [provider, request.method, request.path, sorted(request.args.items(multi=True)), body],
+        sort_keys=True, default=str
+    ).encode('utf-8')).hexdigest()
+
+
+def _fixture_paths(provider: str, key: str) -> Tuple[Path, Path]:
+    directory = FAKE_PROVIDER_DIR / "recorded" / provider
+    return directory / f"{key}.json", directory / f"{key}.bin"
+
+
+def _rewrite_media_links(body: bytes) -> bytes:
+    base = request.host_url.rstrip('/')
+    return MEDIA_HOSTS.sub(lambda m: f"{base}/_media?url={quote(m.group(0), safe='')}", body.decode('utf-8')).encode('utf-8')
+
+
+def _record(provider: str, upstream_url: str, key: str) -> Response:
+    headers = {k: v for k, v in request.headers.items() if k.lower() not in ('host', 'content-length', 'accept-encoding', 'range')}
+    params = None if provider == "media" else request.args
+    upstream = requests.request(request.method, upstream_url, params=params, data=request.get_data(),
+                                headers=headers, timeout=300)
+    body = upstream.content
+    if provider == "pexels" and upstream.ok:
+        body = _rewrite_media_links(body)
+
+    meta_path, body_path = _fixture_paths(provider, key)
+    meta_path.parent.mkdir(parents=True, exist_ok=True)
+    body_path.write_bytes(body)
+    meta_path.write_text(json.dumps({
+        "method": request.method,
+        "path": request.path,
+        "status": upstream.status_code,
+        "headers": {h: upstream.headers[h] for h in RECORDED_HEADERS if h in upstream.headers},
+    }, indent=2))
+    return _replay(provider, key)
+
+
+def _replay(provider: str, key: str) -> Response:
+    meta_path, body_path = _fixture_paths(provider, key)
+    if not meta_path.exists():
+        _count(provider, "replay_misses")
+        response = jsonify({"error": f"No recorded {provider} fixture for {request.method} {request.path}"})
+        response.status_code = 501
+        return response
+    meta = json.loads(meta_path.read_text())
+    if meta["status"] == 200:
+        return send_file(body_path, mimetype=meta["headers"].get("Content-Type"), conditional=True)
+    return Response(body_path.read_bytes(), status=meta["status"], headers=meta["headers"])
+
+
+def _serve(provider: str, synthesize, upstream_url: Optional[str] = None) -> Response:
+    _count(provider, "requests")
+    injected = _inject(provider)
+    if injected is not None:
+        return injected
+
+    if FAKE_PROVIDER_MODE == 'synthetic':
+        return synthesize()
+    key = _request_key(provider)
+    if FAKE_PROVIDER_MODE == 'record':
+        return _record(provider, upstream_url or f"{UPSTREAMS[provider]}{request.path}", key)
+    return _replay(provider, key)
+
+
+def _ffmpeg(args, output: Path):
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output.with_name(f".{output.name}.tmp")
+    subprocess.run([imageio_ffmpeg.get_ffmpeg_exe(), '-y', '-loglevel', 'error', *args, '-f', output.suffix.lstrip('.'), str(tmp)],
+                   check=True, stdin=subprocess.DEVNULL)
+    os.replace(tmp, output)
+
+
+def _synthetic_media(name: str, build) -> Path:
+    path = FAKE_PROVIDER_DIR / "synthetic" / name
+    with _media_lock:
+        if not path.exists():
+            build(path)
+    return path
+
+
+def _tone_mp3(seconds: float, frequency: int) -> Path:
+    return _synthetic_media(f"tone_{frequency}_{seconds:g}.mp3", lambda path: _ffmpeg([
+        '-f', 'lavfi', '-i', f'sine=frequency={frequency}:duration={seconds:g}:sample_rate=44100',
+        '-ac', '1', '-b:a', '64k'
+    ], path))
+
+
+def _test_mp4(seconds: int, width: int, height: int) -> Path:
+    return _synthetic_media(f"clip_{seconds}s_{width}x{height}.mp4", lambda path: _ffmpeg([
+        '-f', 'lavfi', '-i', f'testsrc2=size={width}x{height}:rate=25:duration={seconds}',
+        '-c:v', 'libx264', '-preset', 'ultrafast', '-pix_fmt', 'yuv420p', '-movflags', '+faststart'
+    ], path))
+
+
+def _gradient_image(seed: int, width: int, height: int, fmt: str) -> bytes:
+    rng = np.random.default_rng(seed)
+    start, end = rng.integers(0, 256, size=(2, 3))
+    weights = (np.linspace(0, 1, width)[None, :] * 0.7 + np.linspace(0, 1, height)[:, None] * 0.3)[..., None]
+    pixels = (start + (end - start) * weights).astype(np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels, 'RGB').save(buffer, format='JPEG' if fmt in ('jpg', 'jpeg') else fmt.upper())
+    return buffer.getvalue()
+
+
+def _script_text(prompt: str, seed: int) -> str:
+    match = re.search(r'(\d+)\s*(?:-|and)\s*(\d+)\s*words', prompt)
+    words = (int(match.group(1)) + int(match.group(2))) // 2 if match else 150
+    rng = random.Random(seed)
+    vocabulary = ("light", "ocean", "signal", "memory", "planet", "curious", "ancient", "hidden", "pattern",
+                  "energy", "machine", "forest", "question", "brain", "history", "city", "river", "secret")
+    paragraphs, remaining = [], words
+    while remaining > 0:
+        sentences = []
+        for _ in range(rng.randint(3, 5)):
+            length = min(remaining, rng.randint(8, 16))
+            if length <= 0:
+                break
+            sentences.append(' '.join(rng.choice(vocabulary) for _ in range(length)).capitalize() + '.')
+            remaining -= length
+        paragraphs.append(' '.join(sentences))
+    return '\n\n'.join(paragraphs)
+
+
+def _llm_content(payload: Dict) -> str:
+    prompt = '\n'.join(str(m.get("content", "")) for m in payload.get("messages", []))
+    seed = _seed_for("openai", prompt)
+    keywords = [f"cinematic scene {i}" for i in range(15)]
+
+    if (payload.get("response_format") or {}).get("type") == "json_object":
+        return json.dumps({
+            "script": _script_text(prompt, seed),
+            "keywords": keywords,
+            "image_prompts": [f"cinematic landscape, variant {i}, high detail" for i in range(12)],
+            "title": "A Synthetic Benchmark Video",
+            "description": "A deterministic description for offline benchmarking. ✨",
+            "tags": ["benchmark", "synthetic", "offline"],
+        })
+    if '---' in prompt and 'metadata' in prompt:
+        return "A Synthetic Benchmark Video\n---\nA deterministic description for offline benchmarking. ✨\n---\nbenchmark, synthetic, offline"
+    if 'keywords' in prompt:
+        return ', '.join(keywords)
+    return _script_text(prompt, seed)
+
+
+def _chat_completion() -> Response:
+    payload = request.get_json(silent=True) or {}
+    content = _llm_content(payload)
+    model = payload.get("model", "gpt-4o")
+    completion_id = f"chatcmpl-{_seed_for(content) % 10**12}"
+
+    if not payload.get("stream"):
+        return jsonify({
+            "id": completion_id, "object": "chat.completion", "created": int(time.time()), "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": len(content.split()), "total_tokens": len(content.split())},
+        })
+
+    median, _ = LATENCY["openai"]
+    pieces = re.findall(r'\S+\s*', content)
+    per_piece = median / max(len(pieces), 1)
+
+    def events():
+        for piece in pieces:
+            time.sleep(per_piece)
+            chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                     "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+            yield f"data: {json.dumps(chunk)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return Response(events(), mimetype='text/event-stream')
+
+
+def _pexels_videos() -> Response:
+    query = request.args.get('query', '')
+    per_page = int(request.args.get('per_page', 15))
+    base = request.host_url.rstrip('/')
+    videos = []
+    for i in range(per_page):
+        video_id = _seed_for("pexels_v", query, i) % 10**8
+        seconds = 8 + video_id % 4 * 4
+        videos.append({
+            "id": video_id,
+            "duration": seconds,
+            "video_files": [
+                {"id": video_id * 10 + 1, "quality": "sd", "file_type": "video/mp4", "width": 640, "height": 360,
+                 "link": f"{base}/_synthetic/video/{seconds}/640x360/{video_id}.mp4"},
+                {"id": video_id * 10 + 2, "quality": "hd", "file_type": "video/mp4", "width": 1280, "height": 720,
+                 "link": f"{base}/_synthetic/video/{seconds}/1280x720/{video_id}.mp4"},
+            ],
+        })
+    return jsonify({"page": 1, "per_page": per_page, "total_results": per_page, "videos": videos})
+
+
+def _pexels_photos() -> Response:
+    query = request.args.get('query', '')
+    per_page = int(request.args.get('per_page', 15))
+    base = request.host_url.rstrip('/')
+    photos = [
+        {"id": photo_id, "width": 1920, "height": 1080,
+         "src": {"large2x": f"{base}/_synthetic/image/{photo_id}.jpg", "large": f"{base}/_synthetic/image/{photo_id}.jpg"}}
+        for photo_id in (_seed_for("pexels_i", query, i) % 10**8 for i in range(per_page))
+    ]
+    return jsonify({"page": 1, "per_page": per_page, "total_results": per_page, "photos": photos})
+
+
+def _tts(voice_id: str) -> Response:
+    text = (request.get_json(silent=True) or {}).get("text", "")
+    seconds = max(0.5, round(len(text.split()) / 2.5, 1))
+    frequency = 220 + _seed_for("voice", voice_id) % 440
+    return send_file(_tone_mp3(seconds, frequency), mimetype='audio/mpeg')
+
+
+def _stability_image(model: str) -> Response:
+    fmt = request.form.get('output_format', 'png')
+    seed = _seed_for("stability", model, sorted(request.form.items(multi=True)))
+    return Response(_gradient_image(seed, 1344, 768, fmt), mimetype=f"image/{'jpeg' if fmt in ('jpg', 'jpeg') else fmt}")
+
+
+@app.route('/videos/search')
+def pexels_video_search():
+    return _serve("pexels", _pexels_videos)
+
+
+@app.route('/v1/search')
+def pexels_photo_search():
+    return _serve("pexels", _pexels_photos)
+
+
+@app.route('/v1/text-to-speech/<voice_id>', methods=['POST'])
+def elevenlabs_tts(voice_id):
+    return _serve("elevenlabs", lambda: _tts(voice_id))
+
+
+@app.route('/v1/voices')
+def elevenlabs_voices():
+    return _serve("elevenlabs", lambda: jsonify({"voices": [
+        {"voice_id": "21m00Tcm4TlvDq8ikWAM", "name": "Rachel", "category": "premade"},
+        {"voice_id": "ErXwobaYiN019PkySvjV", "name": "Antoni", "category": "premade"},
+    ]}))
+
+
+@app.route('/v1/user/subscription')
+def elevenlabs_subscription():
+    return _serve("elevenlabs", lambda: jsonify({
+        "tier": "synthetic", "character_count": 0, "character_limit": 10**7
+    }))
+
+
+@app.route('/v2beta/stable-image/generate/<model>', methods=['POST'])
+def stability_generate(model):
+    return _serve("stability", lambda: _stability_image(model))
+
+
+@app.route('/v1/chat/completions', methods=['POST'])
+def openai_chat_completions():
+    return _serve("openai", _chat_completion)
+
+
+@app.route('/_synthetic/video/<int:seconds>/<size>/<name>')
+def synthetic_video(seconds, size, name):
+    width, height = (int(v) for v in size.split('x'))
+    return _serve("media", lambda: send_file(_test_mp4(seconds, width, height), mimetype='video/mp4', conditional=True))
+
+
+@app.route('/_synthetic/image/<name>')
+def synthetic_image(name):
+    seed = _seed_for("image", name)
+    return _serve("media", lambda: Response(_gradient_image(seed, 1920, 1080, 'jpeg'), mimetype='image/jpeg'))
+
+
+@app.route('/_media')
+def recorded_media():
+    url = request.args.get('url', '')
+    if FAKE_PROVIDER_MODE == 'synthetic' or not MEDIA_HOSTS.fullmatch(url):
+        return jsonify({"error": "Unknown media url"}), 404
+    return _serve("media", lambda: None, url)
+
+
+@app.route('/_fake/stats')
+def fake_stats():
+    with _stats_lock:
+        return jsonify({"mode": FAKE_PROVIDER_MODE, "latency": LATENCY, "providers": _stats})
+
+
+if __name__ == '__main__':
+    print(f"🧪 Fake providers ({FAKE_PROVIDER_MODE}) on port {FAKE_PROVIDER_PORT}, fixtures in {FAKE_PROVIDER_DIR}")
+    app.run(port=FAKE_PROVIDER_PORT, host='127.0.0.1', threaded=True)
@@ -2,11 +2,17 @@ from repositories.progress_repository import (
     load_progress,
     save_progress,
     mark_video_completed,
+    mark_videos_completed,
+    unmark_video_completed,
     is_video_completed,
+    get_completed_topics,
     load_generating_videos,
     save_generating_videos,
     add_generating_video,
-    remove_generating_video
+    remove_generating_video,
+    remove_generating_videos,
+    heartbeat_generating_video,
+    get_stale_generations
 )
 from repositories.file_repository import (
     get_folder_size,
@@ -19,11 +25,17 @@ __all__ = [
     'load_progress',
     'save_progress',
     'mark_video_completed',
+    'mark_videos_completed',
+    'unmark_video_completed',
     'is_video_completed',
+    'get_completed_topics',
     'load_generating_videos',
     'save_generating_videos',
     'add_generating_video',
     'remove_generating_video',
+    'remove_generating_videos',
+    'heartbeat_generating_video',
+    'get_stale_generations',
     'get_folder_size',
     'get_video_duration',
     'delete_video_project',
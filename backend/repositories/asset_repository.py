@@ -0,0 +1,137 @@
+import os
+import random
+import re
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from threading import RLock
+from typing import List, Optional, Set, Tuple
+
+from config import CACHE_DIR
+
+ASSET_STORE_DIR = CACHE_DIR / "assets"
+BLOBS_DIR = ASSET_STORE_DIR / "blobs"
+BY_ID_DIR = ASSET_STORE_DIR / "by_id"
+TMP_DIR = ASSET_STORE_DIR / "tmp"
+
+_lock = RLock()
+
+
+def _ensure_store_dirs():
+    for directory in (BLOBS_DIR, BY_ID_DIR, TMP_DIR):
+        directory.mkdir(parents=True, exist_ok=True)
+
+
+def _id_link_path(provider_id: str, ext: str) -> Path:
+    safe_id = re.sub(r'[^\w\-]', '_', provider_id)
+    return BY_ID_DIR / f"{safe_id}.{ext}"
+
+
+def lookup_asset(provider_id: str, ext: str) -> Optional[Path]:
+    link_path = _id_link_path(provider_id, ext)
+    with _lock:
+        if not link_path.is_symlink():
+            return None
+        try:
+            return link_path.resolve(strict=True)
+        except (FileNotFoundError, RuntimeError):
+            link_path.unlink(missing_ok=True)
+            return None
+
+
+def new_temp_path(ext: str) -> Path:
+    _ensure_store_dirs()
+    fd, tmp_path = tempfile.mkstemp(dir=str(TMP_DIR), suffix=f".{ext}.tmp")
+    os.close(fd)
+    return Path(tmp_path)
+
+
+def commit_asset(provider_id: str, tmp_path: Path, content_hash: str, ext: str) -> Path:
+    _ensure_store_dirs()
+    blob_path = BLOBS_DIR / content_hash[:2] / f"{content_hash}.{ext}"
+    link_path = _id_link_path(provider_id, ext)
+
+    with _lock:
+        blob_path.parent.mkdir(exist_ok=True)
+        if blob_path.exists():
+            tmp_path.unlink(missing_ok=True)
+        else:
+            os.replace(tmp_path, blob_path)
+
+        tmp_link = link_path.with_name(f".{link_path.name}.{os.getpid()}.tmp")
+        tmp_link.unlink(missing_ok=True)
+        os.symlink(os.path.relpath(blob_path, BY_ID_DIR), tmp_link)
+        os.replace(tmp_link, link_path)
+
+    return blob_path
+
+
+def link_asset(blob_path: Path, dest_path: Path) -> bool:
+    with _lock:
+        try:
+            dest_path.unlink(missing_ok=True)
+            try:
+                os.link(blob_path, dest_path)
+            except OSError as e:
+                if not blob_path.exists():
+                    return False
+                print(f"Hardlink failed for {blob_path.name} ({e}), copying instead")
+                shutil.copy2(blob_path, dest_path)
+            return True
+        except FileNotFoundError:
+            return False
+
+
+def sample_cached_assets(count: int) -> List[Path]:
+    if count <= 0 or not BLOBS_DIR.exists():
+        return []
+    with _lock:
+        blobs = [path for path in BLOBS_DIR.glob("*/*") if path.suffix in ('.mp4', '.jpg')]
+    return random.sample(blobs, min(count, len(blobs)))
+
+
+def _shared_inodes(root: Path) -> Set[Tuple[int, int]]:
+    inodes = set()
+    if not root.exists():
+        return inodes
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            try:
+                st = os.lstat(os.path.join(dirpath, filename))
+            except OSError:
+                continue
+            if st.st_nlink > 1:
+                inodes.add((st.st_dev, st.st_ino))
+    return inodes
+
+
+def free_unreferenced_assets(inodes: Set[Tuple[int, int]]) -> int:
+    if not inodes or not BLOBS_DIR.exists():
+        return 0
+
+    freed = 0
+    with _lock:
+        for blob_path in BLOBS_DIR.glob("*/*"):
+            try:
+                st = blob_path.stat()
+            except OSError:
+                continue
+            if (st.st_dev, st.st_ino) in inodes and st.st_nlink == 1:
+                blob_path.unlink(missing_ok=True)
+                freed += st.st_size
+
+        for link_path in BY_ID_DIR.iterdir():
+            if link_path.is_symlink() and not link_path.exists():
+                link_path.unlink(missing_ok=True)
+
+    return freed
+
+
+@contextmanager
+def releasing_assets(root: Path):
+    inodes = _shared_inodes(root)
+    yield
+    freed = free_unreferenced_assets(inodes)
+    if freed:
+        print(f"Freed {freed / (1024 * 1024):.1f} MB of unshared assets from the asset store")
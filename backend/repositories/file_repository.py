@@ -4,15 +4,21 @@ import json
 from pathlib import Path
 from moviepy import VideoFileClip
 from config import OUTPUT_DIR
+from repositories.asset_repository import releasing_assets
 
-def get_folder_size(folder_path):
+def get_folder_size(folder_path, seen_inodes=None):
     total_size = 0
     try:
         for dirpath, dirnames, filenames in os.walk(folder_path):
             for filename in filenames:
                 filepath = os.path.join(dirpath, filename)
                 if os.path.exists(filepath) and not os.path.islink(filepath):
-                    total_size += os.path.getsize(filepath)
+                    st = os.stat(filepath)
+                    if seen_inodes is not None and st.st_nlink > 1:
+                        if (st.st_dev, st.st_ino) in seen_inodes:
+                            continue
+                        seen_inodes.add((st.st_dev, st.st_ino))
+                    total_size += st.st_size
     except Exception as e:
         print(f"Error calculating folder size for {folder_path}: {e}")
     return total_size
@@ -27,7 +33,8 @@ def get_video_duration(video_path):
 def delete_video_project(project_name):
     project_dir = OUTPUT_DIR / project_name
     if project_dir.exists():
-        shutil.rmtree(project_dir)
+        with releasing_assets(project_dir / "assets"):
+            shutil.rmtree(project_dir)
         return True
     return False
 
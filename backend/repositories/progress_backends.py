@@ -0,0 +1,430 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import fcntl
+from contextlib import contextmanager
+from threading import RLock
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Set
+
+
+GENERATING_COLUMNS = ("topic", "progress_id", "video_type", "started_at", "heartbeat_at")
+CACHE_TTL = 1.0
+
+
+def _acquire_file_lock(file_handle, timeout=5.0):
+    start_time = time.time()
+    while True:
+        try:
+            fcntl.flock(file_handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except (IOError, OSError):
+            if time.time() - start_time > timeout:
+                return False
+            time.sleep(0.01)
+
+
+def _release_file_lock(file_handle):
+    try:
+        fcntl.flock(file_handle.fileno(), fcntl.LOCK_UN)
+    except (IOError, OSError):
+        pass
+
+
+def _read_json_with_lock(path: Path, default: Any) -> Any:
+    if not path.exists():
+        return default
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            if not _acquire_file_lock(f, timeout=5.0):
+                print(f"Warning: Could not acquire lock for {path}, using default")
+                return default
+
+            try:
+                content = f.read()
+                if not content.strip():
+                    return default
+                data = json.loads(content)
+                return data if isinstance(data, type(default)) else default
+            finally:
+                _release_file_lock(f)
+    except json.JSONDecodeError as e:
+        print(f"Warning: JSON decode error in {path}: {e}")
+        return default
+    except Exception as e:
+        print(f"Warning: Error reading {path}: {e}")
+        return default
+
+
+def _atomic_write_with_lock(path: Path, data: Any) -> bool:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = None
+    tmp_path = None
+
+    try:
+        fd, tmp_path = tempfile.mkstemp(
+            dir=str(path.parent),
+            prefix=f".{path.name}.",
+            suffix=".tmp",
+            text=True
+        )
+
+        with os.fdopen(fd, "w", encoding="utf-8") as tmp:
+            fd = None
+
+            if not _acquire_file_lock(tmp, timeout=5.0):
+                print(f"Warning: Could not acquire lock for writing {path}")
+                return False
+
+            try:
+                json.dump(data, tmp, ensure_ascii=False, indent=2)
+                tmp.flush()
+                os.fsync(tmp.fileno())
+            finally:
+                _release_file_lock(tmp)
+
+        os.replace(tmp_path, path)
+        return True
+
+    except Exception as e:
+        print(f"Error writing {path}: {e}")
+        return False
+    finally:
+        if tmp_path and os.path.exists(tmp_path):
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+        if fd is not None:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+class JsonProgressBackend:
+    def __init__(self, progress_file: Path, generating_file: Path):
+        self.progress_file = progress_file
+        self.generating_file = generating_file
+        self._lock = RLock()
+        self._progress_cache = {"data": None, "timestamp": 0}
+        self._generating_cache = {"data": None, "timestamp": 0}
+
+    def _load_progress(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.time()
+
+            if (self._progress_cache["data"] is not None and
+                now - self._progress_cache["timestamp"] < CACHE_TTL):
+                return self._progress_cache["data"]
+
+            data = _read_json_with_lock(self.progress_file, {"completed": []})
+
+            if "completed" not in data or not isinstance(data["completed"], list):
+                data["completed"] = []
+
+            self._progress_cache["data"] = data
+            self._progress_cache["timestamp"] = now
+
+            return data
+
+    def load_completed(self) -> List[str]:
+        return list(self._load_progress()["completed"])
+
+    def completed_set(self) -> Set[str]:
+        return set(self._load_progress()["completed"])
+
+    def has_completed(self, topic: str) -> bool:
+        return topic in self.completed_set()
+
+    def replace_completed(self, topics: List[str]) -> bool:
+        with self._lock:
+            data = dict(self._load_progress())
+            data["completed"] = list(topics)
+
+            success = _atomic_write_with_lock(self.progress_file, data)
+
+            if success:
+                self._progress_cache["data"] = data
+                self._progress_cache["timestamp"] = time.time()
+
+            return success
+
+    def add_completed(self, topics: Iterable[str]) -> bool:
+        with self._lock:
+            completed = self.load_completed()
+            added = [t for t in dict.fromkeys(topics) if t not in completed]
+            if not added:
+                return True
+            return self.replace_completed(completed + added)
+
+    def remove_completed(self, topics: Iterable[str]) -> bool:
+        with self._lock:
+            removed = set(topics)
+            completed = self.load_completed()
+            remaining = [t for t in completed if t not in removed]
+            if len(remaining) == len(completed):
+                return True
+            return self.replace_completed(remaining)
+
+    def load_generating(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.time()
+
+            if (self._generating_cache["data"] is not None and
+                now - self._generating_cache["timestamp"] < CACHE_TTL):
+                return dict(self._generating_cache["data"])
+
+            data = _read_json_with_lock(self.generating_file, {})
+
+            self._generating_cache["data"] = data
+            self._generating_cache["timestamp"] = now
+
+            return dict(data)
+
+    def replace_generating(self, obj: Dict[str, Any]) -> bool:
+        with self._lock:
+            success = _atomic_write_with_lock(self.generating_file, obj)
+
+            if success:
+                self._generating_cache["data"] = dict(obj)
+                self._generating_cache["timestamp"] = time.time()
+
+            return success
+
+    def put_generating(self, project_name: str, entry: Dict[str, Any]) -> bool:
+        with self._lock:
+            data = self.load_generating()
+            data[project_name] = entry
+            return self.replace_generating(data)
+
+    def delete_generating(self, project_names: Iterable[str]) -> bool:
+        with self._lock:
+            data = self.load_generating()
+            removed = [name for name in project_names if name in data]
+            if not removed:
+                return True
+            for name in removed:
+                del data[name]
+            return self.replace_generating(data)
+
+    def touch_generating(self, project_name: str, timestamp: int) -> bool:
+        with self._lock:
+            data = self.load_generating()
+            if project_name not in data:
+                return False
+            data[project_name] = dict(data[project_name], heartbeat_at=timestamp)
+            return self.replace_generating(data)
+
+
+class SqliteProgressBackend:
+    SCHEMA_VERSION = 2
+
+    def __init__(self, db_path: Path, progress_file: Path, generating_file: Path):
+        self.db_path = db_path
+        self.progress_file = progress_file
+        self.generating_file = generating_file
+        self._local = threading.local()
+        self._init_lock = RLock()
+        self._initialized = False
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and getattr(self._local, "pid", None) == os.getpid():
+            return conn
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), timeout=5.0, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+
+        with self._init_lock:
+            if not self._initialized:
+                self._migrate_schema(conn)
+                self._import_json_files(conn)
+                self._initialized = True
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _migrate_schema(self, conn: sqlite3.Connection):
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= self.SCHEMA_VERSION:
+            return
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS completed_videos (
+                    topic TEXT NOT NULL UNIQUE,
+                    completed_at INTEGER NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS generating_videos (
+                    project_name TEXT PRIMARY KEY,
+                    topic TEXT,
+                    progress_id TEXT,
+                    video_type TEXT,
+                    started_at INTEGER,
+                    extra TEXT
+                )
+            """)
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            if version < 2:
+                columns = {row["name"] for row in conn.execute("PRAGMA table_info(generating_videos)")}
+                if "heartbeat_at" not in columns:
+                    conn.execute("ALTER TABLE generating_videos ADD COLUMN heartbeat_at INTEGER")
+            conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _import_json_files(self, conn: sqlite3.Connection):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'json_imported'").fetchone():
+                conn.execute("COMMIT")
+                return
+
+            completed = _read_json_with_lock(self.progress_file, {"completed": []}).get("completed", [])
+            generating = _read_json_with_lock(self.generating_file, {})
+            now = int(time.time())
+
+            conn.executemany(
+                "INSERT OR IGNORE INTO completed_videos (topic, completed_at) VALUES (?, ?)",
+                [(topic, now) for topic in completed if isinstance(topic, str)]
+            )
+            for project_name, entry in generating.items():
+                if isinstance(entry, dict):
+                    self._upsert_generating(conn, project_name, entry)
+
+            conn.execute("INSERT INTO meta (key, value) VALUES ('json_imported', ?)", (str(now),))
+            conn.execute("COMMIT")
+
+            if completed or generating:
+                print(f"Migrated {len(completed)} completed and {len(generating)} generating videos into {self.db_path.name}")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def load_completed(self) -> List[str]:
+        rows = self._connection().execute("SELECT topic FROM completed_videos ORDER BY rowid")
+        return [row["topic"] for row in rows]
+
+    def completed_set(self) -> Set[str]:
+        return set(self.load_completed())
+
+    def has_completed(self, topic: str) -> bool:
+        row = self._connection().execute("SELECT 1 FROM completed_videos WHERE topic = ?", (topic,)).fetchone()
+        return row is not None
+
+    def replace_completed(self, topics: List[str]) -> bool:
+        now = int(time.time())
+        with self._transaction() as conn:
+            existing = {row["topic"] for row in conn.execute("SELECT topic FROM completed_videos")}
+            wanted = set(topics)
+            conn.executemany("DELETE FROM completed_videos WHERE topic = ?", [(t,) for t in existing - wanted])
+            conn.executemany(
+                "INSERT OR IGNORE INTO completed_videos (topic, completed_at) VALUES (?, ?)",
+                [(t, now) for t in topics if t not in existing]
+            )
+        return True
+
+    def add_completed(self, topics: Iterable[str]) -> bool:
+        now = int(time.time())
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO completed_videos (topic, completed_at) VALUES (?, ?)",
+                [(topic, now) for topic in topics]
+            )
+        return True
+
+    def remove_completed(self, topics: Iterable[str]) -> bool:
+        with self._transaction() as conn:
+            conn.executemany("DELETE FROM completed_videos WHERE topic = ?", [(t,) for t in topics])
+        return True
+
+    def _row_to_entry(self, row: sqlite3.Row) -> Dict[str, Any]:
+        entry = json.loads(row["extra"]) if row["extra"] else {}
+        for column in GENERATING_COLUMNS:
+            if row[column] is not None:
+                entry[column] = row[column]
+        return entry
+
+    def _upsert_generating(self, conn: sqlite3.Connection, project_name: str, entry: Dict[str, Any]):
+        extra = {k: v for k, v in entry.items() if k not in GENERATING_COLUMNS}
+        conn.execute(
+            """
+            INSERT INTO generating_videos (project_name, topic, progress_id, video_type, started_at, heartbeat_at, extra)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(project_name) DO UPDATE SET
+                topic = excluded.topic,
+                progress_id = excluded.progress_id,
+                video_type = excluded.video_type,
+                started_at = excluded.started_at,
+                heartbeat_at = excluded.heartbeat_at,
+                extra = excluded.extra
+            """,
+            (
+                project_name,
+                entry.get("topic"),
+                entry.get("progress_id"),
+                entry.get("video_type"),
+                entry.get("started_at"),
+                entry.get("heartbeat_at"),
+                json.dumps(extra, ensure_ascii=False) if extra else None
+            )
+        )
+
+    def load_generating(self) -> Dict[str, Any]:
+        rows = self._connection().execute("SELECT * FROM generating_videos")
+        return {row["project_name"]: self._row_to_entry(row) for row in rows}
+
+    def replace_generating(self, obj: Dict[str, Any]) -> bool:
+        with self._transaction() as conn:
+            existing = {row["project_name"] for row in conn.execute("SELECT project_name FROM generating_videos")}
+            conn.executemany(
+                "DELETE FROM generating_videos WHERE project_name = ?",
+                [(name,) for name in existing - set(obj)]
+            )
+            for project_name, entry in obj.items():
+                self._upsert_generating(conn, project_name, entry)
+        return True
+
+    def put_generating(self, project_name: str, entry: Dict[str, Any]) -> bool:
+        with self._transaction() as conn:
+            self._upsert_generating(conn, project_name, entry)
+        return True
+
+    def delete_generating(self, project_names: Iterable[str]) -> bool:
+        with self._transaction() as conn:
+            conn.executemany("DELETE FROM generating_videos WHERE project_name = ?", [(n,) for n in project_names])
+        return True
+
+    def touch_generating(self, project_name: str, timestamp: int) -> bool:
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE generating_videos SET heartbeat_at = ? WHERE project_name = ?",
+                (timestamp, project_name)
+            )
+        return cursor.rowcount > 0
@@ -1,234 +1,103 @@
-import json
-import os
-import tempfile
 import time
-import fcntl
 from threading import RLock
-from pathlib import Path
-from typing import Dict, Any
-from config import PROGRESS_FILE, GENERATING_VIDEOS_FILE
+from typing import Dict, Any, Iterable, Optional, Set
+from config import PROGRESS_BACKEND, PROGRESS_DB_FILE, PROGRESS_FILE, GENERATING_VIDEOS_FILE
+from repositories.progress_backends import JsonProgressBackend, SqliteProgressBackend
 
 
 _lock = RLock()
-_progress_cache = {"data": None, "timestamp": 0}
-_generating_cache = {"data": None, "timestamp": 0}
-CACHE_TTL = 1.0
 
 
-def _acquire_file_lock(file_handle, timeout=5.0):
-    start_time = time.time()
-    while True:
-        try:
-            fcntl.flock(file_handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
-            return True
-        except (IOError, OSError):
-            if time.time() - start_time > timeout:
-                return False
-            time.sleep(0.01)
+def _create_backend():
+    if PROGRESS_BACKEND == 'json':
+        return JsonProgressBackend(PROGRESS_FILE, GENERATING_VIDEOS_FILE)
+    return SqliteProgressBackend(PROGRESS_DB_FILE, PROGRESS_FILE, GENERATING_VIDEOS_FILE)
 
 
-def _release_file_lock(file_handle):
-    try:
-        fcntl.flock(file_handle.fileno(), fcntl.LOCK_UN)
-    except (IOError, OSError):
-        pass
+_backend = _create_backend()
 
 
-def _read_json_with_lock(path: Path, default: Any) -> Any:
-    if not path.exists():
-        return default
-    
+def _safe_call(operation: str, default: Any, func, *args):
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            if not _acquire_file_lock(f, timeout=5.0):
-                print(f"Warning: Could not acquire lock for {path}, using default")
-                return default
-            
-            try:
-                content = f.read()
-                if not content.strip():
-                    return default
-                data = json.loads(content)
-                return data if isinstance(data, type(default)) else default
-            finally:
-                _release_file_lock(f)
-    except json.JSONDecodeError as e:
-        print(f"Warning: JSON decode error in {path}: {e}")
-        return default
+        return func(*args)
     except Exception as e:
-        print(f"Warning: Error reading {path}: {e}")
+        print(f"Error in progress repository ({operation}): {e}")
         return default
 
 
-def _atomic_write_with_lock(path: Path, data: Any) -> bool:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    fd = None
-    tmp_path = None
-    
-    try:
-        fd, tmp_path = tempfile.mkstemp(
-            dir=str(path.parent),
-            prefix=f".{path.name}.",
-            suffix=".tmp",
-            text=True
-        )
-        
-        with os.fdopen(fd, "w", encoding="utf-8") as tmp:
-            fd = None
-            
-            if not _acquire_file_lock(tmp, timeout=5.0):
-                print(f"Warning: Could not acquire lock for writing {path}")
-                return False
-            
-            try:
-                json.dump(data, tmp, ensure_ascii=False, indent=2)
-                tmp.flush()
-                os.fsync(tmp.fileno())
-            finally:
-                _release_file_lock(tmp)
-        
-        os.replace(tmp_path, path)
-        return True
-        
-    except Exception as e:
-        print(f"Error writing {path}: {e}")
-        return False
-    finally:
-        if tmp_path and os.path.exists(tmp_path):
-            try:
-                os.remove(tmp_path)
-            except OSError:
-                pass
-        if fd is not None:
-            try:
-                os.close(fd)
-            except OSError:
-                pass
-
-
 def load_progress() -> Dict[str, Any]:
-    with _lock:
-        now = time.time()
-        
-        if (_progress_cache["data"] is not None and 
-            now - _progress_cache["timestamp"] < CACHE_TTL):
-            return _progress_cache["data"].copy()
-        
-        data = _read_json_with_lock(PROGRESS_FILE, {"completed": []})
-        
-        if "completed" not in data or not isinstance(data["completed"], list):
-            data["completed"] = []
-        
-        _progress_cache["data"] = data
-        _progress_cache["timestamp"] = now
-        
-        return data.copy()
+    return {"completed": _safe_call("load_progress", [], _backend.load_completed)}
 
 
 def save_progress(data: Dict[str, Any]) -> bool:
-    with _lock:
-        if "completed" not in data or not isinstance(data["completed"], list):
-            data["completed"] = []
-        
-        success = _atomic_write_with_lock(PROGRESS_FILE, data)
-        
-        if success:
-            _progress_cache["data"] = data.copy()
-            _progress_cache["timestamp"] = time.time()
-        
-        return success
+    completed = data.get("completed")
+    if not isinstance(completed, list):
+        completed = []
+    return _safe_call("save_progress", False, _backend.replace_completed, completed)
 
 
 def mark_video_completed(topic: str) -> bool:
-    with _lock:
-        data = load_progress()
-        
-        if topic not in data["completed"]:
-            data["completed"].append(topic)
-            return save_progress(data)
-        
-        return True
+    return _safe_call("mark_video_completed", False, _backend.add_completed, [topic])
+
+
+def mark_videos_completed(topics: Iterable[str]) -> bool:
+    return _safe_call("mark_videos_completed", False, _backend.add_completed, list(topics))
+
+
+def unmark_video_completed(topics: Iterable[str]) -> bool:
+    return _safe_call("unmark_video_completed", False, _backend.remove_completed, list(topics))
 
 
 def is_video_completed(topic: str) -> bool:
-    with _lock:
-        data = load_progress()
-        return topic in data["completed"]
+    return _safe_call("is_video_completed", False, _backend.has_completed, topic)
+
+
+def get_completed_topics() -> Set[str]:
+    return _safe_call("get_completed_topics", set(), _backend.completed_set)
 
 
 def load_generating_videos() -> Dict[str, Any]:
-    with _lock:
-        now = time.time()
-        
-        if (_generating_cache["data"] is not None and 
-            now - _generating_cache["timestamp"] < CACHE_TTL):
-            return _generating_cache["data"].copy()
-        
-        data = _read_json_with_lock(GENERATING_VIDEOS_FILE, {})
-        
-        _generating_cache["data"] = data
-        _generating_cache["timestamp"] = now
-        
-        return data.copy()
+    return _safe_call("load_generating_videos", {}, _backend.load_generating)
 
 
 def save_generating_videos(obj: Dict[str, Any]) -> bool:
-    with _lock:
-        success = _atomic_write_with_lock(GENERATING_VIDEOS_FILE, obj)
-        
-        if success:
-            _generating_cache["data"] = obj.copy()
-            _generating_cache["timestamp"] = time.time()
-        
-        return success
+    return _safe_call("save_generating_videos", False, _backend.replace_generating, obj)
 
 
-def add_generating_video(project_name: str, topic: str, progress_id: str, video_type: str) -> bool:
+def add_generating_video(project_name: str, topic: str, progress_id: str, video_type: str, config: Optional[Dict[str, Any]] = None) -> bool:
     with _lock:
-        data = load_generating_videos()
-        
-        if project_name in data:
+        if project_name in load_generating_videos():
             print(f"Warning: Project {project_name} already exists in generating videos")
-        
-        data[project_name] = {
+
+        now = int(time.time())
+        entry = {
             "topic": topic,
             "progress_id": progress_id,
             "video_type": video_type,
-            "started_at": int(time.time())
+            "started_at": now,
+            "heartbeat_at": now
         }
-        
-        return save_generating_videos(data)
+        if config:
+            entry["config"] = config
+
+        return _safe_call("add_generating_video", False, _backend.put_generating, project_name, entry)
 
 
 def remove_generating_video(project_name: str) -> bool:
-    with _lock:
-        data = load_generating_videos()
-        
-        if project_name in data:
-            del data[project_name]
-            return save_generating_videos(data)
-        
-        return True
+    return _safe_call("remove_generating_video", False, _backend.delete_generating, [project_name])
 
 
-def cleanup_stale_generations(max_age_seconds: int = 3600) -> int:
-    with _lock:
-        data = load_generating_videos()
-        now = int(time.time())
-        removed = 0
-        
-        stale_projects = []
-        for project_name, info in data.items():
-            started_at = info.get("started_at", 0)
-            if now - started_at > max_age_seconds:
-                stale_projects.append(project_name)
-        
-        for project_name in stale_projects:
-            del data[project_name]
-            removed += 1
-        
-        if removed > 0:
-            save_generating_videos(data)
-            print(f"Cleaned up {removed} stale generation entries")
-        
-        return removed
\ No newline at end of file
+def remove_generating_videos(project_names: Iterable[str]) -> bool:
+    return _safe_call("remove_generating_videos", False, _backend.delete_generating, list(project_names))
+
+
+def heartbeat_generating_video(project_name: str) -> bool:
+    return _safe_call("heartbeat_generating_video", False, _backend.touch_generating, project_name, int(time.time()))
+
+
+def get_stale_generations(max_idle_seconds: int) -> Dict[str, Any]:
+    now = int(time.time())
+    return {
+        project_name: info for project_name, info in load_generating_videos().items()
+        if now - info.get("heartbeat_at", info.get("started_at", 0)) > max_idle_seconds
+    }
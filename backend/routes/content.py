@@ -1,14 +1,10 @@
-import base64
-import os
-import tempfile
-import requests
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, send_file
 from flask_cors import cross_origin
-from elevenlabs import generate
 
-from config import ELEVENLABS_API_KEY
+from client.elevenlabs_client import synthesize_cached, get_voices as get_cached_voices
+from config import VOICE_PREVIEW_MAX_AGE_SECONDS
 from constants import WHY_TOPICS, WHAT_IF_TOPICS, HIDDEN_TRUTHS_TOPICS
-from repositories.progress_repository import load_progress
+from repositories.progress_repository import get_completed_topics
 from utils.validation import InputValidator, ValidationError
 
 content_bp = Blueprint('content_api', __name__, url_prefix='/api')
@@ -19,8 +15,7 @@ def get_topics():
     if request.method == 'OPTIONS':
         return jsonify({}), 200
         
-    progress = load_progress()
-    completed = progress.get("completed", [])
+    completed = get_completed_topics()
     
     return jsonify({
         "why": [{"title": t, "completed": t in completed} for t in WHY_TOPICS],
@@ -40,46 +35,31 @@ def get_voices():
         {"voice_id": "VR6AewLTigWG4xSOukaG", "name": "Arnold", "category": "premade", "description": "Crisp, middle-aged male", "recommended_for": ["standard", "shorts"]},
     ]
     
-    try:
-        headers = {"xi-api-key": ELEVENLABS_API_KEY}
-        response = requests.get("https://api.elevenlabs.io/v1/voices", headers=headers, timeout=5)
-        
-        if response.status_code == 200:
-            data = response.json()
-            return jsonify(data)
-        else:
-            raise Exception(f"API call failed with status {response.status_code}")
-    except Exception as e:
-        print(f"Error fetching voices: {e}")
+    data = get_cached_voices()
+    if not data or not data.get("voices"):
         return jsonify({"voices": fallback_voices})
+    return jsonify(data)
 
-@content_bp.route('/test-voice', methods=['POST', 'OPTIONS'])
+@content_bp.route('/test-voice', methods=['GET', 'POST', 'OPTIONS'])
 @cross_origin()
 def test_voice():
     if request.method == 'OPTIONS':
         return jsonify({}), 200
     
     try:
-        data = request.json
+        data = request.args if request.method == 'GET' else (request.json or {})
         voice_id = InputValidator.validate_voice_id(data.get('voice_id'))
         video_type = InputValidator.validate_video_type(data.get('video_type', 'standard'))
         
         test_text = "Did you know this mind-blowing fact?" if video_type == 'shorts' else "Hello! This is how I sound. I'm ready to narrate your videos."
         
-        audio = generate(text=test_text, voice=voice_id, model="eleven_monolingual_v1")
-        
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as temp_file:
-            temp_file.write(audio)
-            temp_path = temp_file.name
-        
-        with open(temp_path, 'rb') as f:
-            audio_base64 = base64.b64encode(f.read()).decode('utf-8')
-        
-        os.unlink(temp_path)
+        audio_path, cache_key = synthesize_cached(test_text, voice_id, "eleven_monolingual_v1")
         
-        return jsonify({"audio_base64": audio_base64})
+        response = send_file(audio_path, mimetype='audio/mpeg', etag=cache_key, conditional=True, max_age=VOICE_PREVIEW_MAX_AGE_SECONDS)
+        response.cache_control.public = True
+        return response
         
     except ValidationError as e:
         return jsonify({"error": str(e)}), 400
     except Exception as e:
-        return jsonify({"error": "Failed to generate voice test"}), 500
\ No newline at end of file
+        return jsonify({"error": "Failed to generate voice test"}), 500
@@ -1,11 +1,15 @@
 import datetime
 import json
-import requests
 from flask import Blueprint, jsonify, request
 from flask_cors import cross_origin
 
-from config import ELEVENLABS_API_KEY, OPENAI_API_KEY, OUTPUT_DIR, MAX_CONCURRENT_VIDEOS
+from client.elevenlabs_client import get_subscription, elevenlabs_breaker
+from client.openai_client import llm_cache_stats
+from config import OPENAI_API_KEY, OUTPUT_DIR, MAX_CONCURRENT_VIDEOS
 from repositories.file_repository import get_folder_size, get_video_duration
+from services.stability_service import stability_limiter, stability_breaker
+from services.stock_service import pexels_breaker, media_breaker
+from utils.disk_cache import DiskCache
 from utils.resource_monitor import ResourceMonitor
 from core.generator import video_generation_semaphore
 
@@ -17,13 +21,10 @@ def get_elevenlabs_usage():
     if request.method == 'OPTIONS':
         return jsonify({}), 200
     
-    try:
-        headers = {"xi-api-key": ELEVENLABS_API_KEY}
-        response = requests.get("https://api.elevenlabs.io/v1/user/subscription", headers=headers, timeout=5)
-        response.raise_for_status()
-        return jsonify(response.json())
-    except Exception as e:
-        return jsonify({"error": f"Could not fetch usage data: {e}"}), 500
+    data = get_subscription()
+    if data is None:
+        return jsonify({"error": "Usage data is not available yet"}), 503
+    return jsonify(data)
 
 @usage_bp.route('/openai/usage', methods=['GET', 'OPTIONS'])
 @cross_origin()
@@ -48,10 +49,11 @@ def get_storage_usage():
     
     total_size, video_count = 0, 0
     projects, video_type_counts = [], {"standard": 0, "shorts": 0}
+    seen_inodes = set()
     
     for project_dir in OUTPUT_DIR.iterdir():
         if project_dir.is_dir():
-            total_size += get_folder_size(project_dir)
+            total_size += get_folder_size(project_dir, seen_inodes)
             if (project_dir / "final_video.mp4").exists():
                 video_count += 1
                 duration = get_video_duration(project_dir / "final_video.mp4")
@@ -82,4 +84,36 @@ def get_system_status():
             "max_concurrent": MAX_CONCURRENT_VIDEOS,
             "can_start_new": ResourceMonitor.can_start_new_video()
         }
-    })
\ No newline at end of file
+    })
+
+@usage_bp.route('/cache/stats', methods=['GET', 'OPTIONS'])
+@cross_origin()
+def get_cache_stats():
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+    
+    stats = DiskCache.all_stats()
+    stats.setdefault("llm", {}).update(llm_cache_stats())
+    return jsonify(stats)
+
+
+@usage_bp.route('/rate-limits', methods=['GET', 'OPTIONS'])
+@cross_origin()
+def get_rate_limits():
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+    
+    return jsonify({"stability": stability_limiter.stats()})
+
+@usage_bp.route('/provider-health', methods=['GET', 'OPTIONS'])
+@cross_origin()
+def get_provider_health():
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+    
+    return jsonify({
+        "stability": stability_breaker.stats(),
+        "pexels": pexels_breaker.stats(),
+        "pexels_media": media_breaker.stats(),
+        "elevenlabs": elevenlabs_breaker.stats(),
+    })
@@ -1,14 +1,17 @@
-from flask import Blueprint, jsonify, request, send_file
+from flask import Blueprint, Response, jsonify, request, send_file
 from flask_cors import cross_origin
+import datetime
+import io
 import json
 import time
 from pathlib import Path
 
 from config import OUTPUT_DIR
 from repositories.progress_repository import (
-    load_progress, save_progress, load_generating_videos, remove_generating_video
+    unmark_video_completed, load_generating_videos, remove_generating_video
 )
 from repositories.file_repository import get_video_duration, delete_video_project
+from utils.archive import stream_zip
 from utils.validation import InputValidator, ValidationError
 
 video_bp = Blueprint('video', __name__, url_prefix='/api')
@@ -20,6 +23,45 @@ def validate_video_name(video_name: str) -> str:
     return InputValidator.sanitize_project_name(video_name)
 
 
+def get_download_basename(video_name: str) -> str:
+    metadata_path = OUTPUT_DIR / video_name / "youtube_metadata.json"
+    
+    if metadata_path.exists():
+        try:
+            with open(metadata_path, 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
+            
+            original_name = metadata.get('original_topic') or metadata.get('title')
+            if original_name:
+                return InputValidator.sanitize_project_name(original_name)
+        except Exception as e:
+            print(f"Could not read metadata for {video_name}: {e}")
+    
+    return video_name
+
+
+def _export_entries(video_names):
+    for video_name in video_names:
+        project_dir = OUTPUT_DIR / video_name
+        basename = get_download_basename(video_name)
+        
+        yield f"{video_name}/{basename}.mp4", project_dir / "final_video.mp4"
+        
+        thumbnail_path = project_dir / "thumbnail.jpg"
+        if thumbnail_path.exists():
+            yield f"{video_name}/{video_name}_thumbnail.jpg", thumbnail_path
+        
+        metadata_path = project_dir / "youtube_metadata.json"
+        if metadata_path.exists():
+            yield f"{video_name}/youtube_metadata.json", metadata_path
+            try:
+                with open(metadata_path, 'r', encoding='utf-8') as f:
+                    description = json.load(f).get('description', 'No Description Found')
+                yield f"{video_name}/{video_name}_youtube_description.txt", description.encode('utf-8')
+            except Exception as e:
+                print(f"Could not read metadata for {video_name}: {e}")
+
+
 @video_bp.route('/videos', methods=['GET', 'OPTIONS'])
 @cross_origin()
 def get_videos():
@@ -59,9 +101,6 @@ def get_videos():
                 except:
                     pass
             
-            if project_dir.name in generating_videos:
-                remove_generating_video(project_dir.name)
-            
             videos.append({
                 "name": project_dir.name,
                 "display_name": project_dir.name.replace('_', ' ').title(),
@@ -106,21 +145,13 @@ def delete_video(video_name):
     try:
         video_name = validate_video_name(video_name)
         
-        progress = load_progress()
-        completed = progress.get("completed", [])
-        
         topic_variations = [
             video_name.replace('_', ' ').title(),
             video_name.replace('_', ' '),
             video_name
         ]
         
-        for variant in topic_variations:
-            if variant in completed:
-                completed.remove(variant)
-        
-        progress["completed"] = completed
-        save_progress(progress)
+        unmark_video_completed(topic_variations)
         
         remove_generating_video(video_name)
         
@@ -151,25 +182,7 @@ def download_video(video_name):
         if not video_path.exists():
             return jsonify({"error": "Video not found"}), 404
 
-        download_filename = f"{video_name}.mp4"
-        metadata_path = project_dir / "youtube_metadata.json"
-        
-        if metadata_path.exists():
-            try:
-                with open(metadata_path, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
-                
-                original_topic = metadata.get('original_topic')
-                if original_topic:
-                    safe_name = InputValidator.sanitize_project_name(original_topic)
-                    download_filename = f"{safe_name}.mp4"
-                else:
-                    original_title = metadata.get('title')
-                    if original_title:
-                        safe_name = InputValidator.sanitize_project_name(original_title)
-                        download_filename = f"{safe_name}.mp4"
-            except Exception as e:
-                print(f"Could not read metadata for {video_name}: {e}")
+        download_filename = f"{get_download_basename(video_name)}.mp4"
         
         return send_file(video_path, as_attachment=True, download_name=download_filename)
         
@@ -245,15 +258,50 @@ def download_metadata(video_name):
         
         text_content = metadata.get('description', 'No Description Found')
         
-        import tempfile
-        with tempfile.NamedTemporaryFile(mode='w', encoding='utf-8', suffix='.txt', delete=False) as temp_file:
-            temp_file.write(text_content)
-            temp_path = temp_file.name
-        
-        return send_file(temp_path, as_attachment=True, download_name=f"{video_name}_youtube_description.txt")
+        return send_file(
+            io.BytesIO(text_content.encode('utf-8')),
+            mimetype='text/plain',
+            as_attachment=True,
+            download_name=f"{video_name}_youtube_description.txt"
+        )
         
     except ValidationError as e:
         return jsonify({"error": str(e)}), 400
     except Exception as e:
         print(f"Error creating metadata text: {e}")
-        return jsonify({"error": "Failed to create metadata file"}), 500
\ No newline at end of file
+        return jsonify({"error": "Failed to create metadata file"}), 500
+
+
+@video_bp.route('/download/export', methods=['GET', 'POST', 'OPTIONS'])
+@cross_origin()
+def download_export():
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+    
+    try:
+        if request.method == 'POST':
+            payload = request.get_json(silent=True)
+            requested = payload.get('videos', []) if isinstance(payload, dict) else []
+        else:
+            requested = [name for value in request.args.getlist('videos') for name in value.split(',')]
+        
+        if not isinstance(requested, list) or not requested or not all(isinstance(name, str) for name in requested):
+            raise ValidationError("At least one video is required")
+        
+        video_names = list(dict.fromkeys(validate_video_name(name) for name in requested))
+        missing = [name for name in video_names if not (OUTPUT_DIR / name / "final_video.mp4").exists()]
+        if missing:
+            return jsonify({"error": "Video not found", "videos": missing}), 404
+        
+        archive_name = f"emberglow_export_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+        return Response(
+            stream_zip(_export_entries(video_names)),
+            mimetype='application/zip',
+            headers={"Content-Disposition": f'attachment; filename="{archive_name}"'}
+        )
+        
+    except ValidationError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(f"Error creating export archive: {e}")
+        return jsonify({"error": "Failed to create export archive"}), 500
@@ -0,0 +1,171 @@
+import asyncio
+import os
+import threading
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Deque, Dict, List, Optional
+
+import httpx
+
+from client import http_client
+from config import ACQUISITION_MAX_SEARCHES, ACQUISITION_MAX_DOWNLOADS, STOCK_MIN_KEYWORD_DIVERSITY
+from services.stability_service import generate_stability_image
+from services.stock_service import search_pexels, download_asset
+
+
+class FairLimiter:
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self.active = 0
+        self._waiters: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+
+    async def acquire(self, job_id: str):
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(job_id, deque()).append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        while self._waiters:
+            job_id, queue = next(iter(self._waiters.items()))
+            waiter = queue.popleft()
+            if queue:
+                self._waiters.move_to_end(job_id)
+            else:
+                del self._waiters[job_id]
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    @asynccontextmanager
+    async def slot(self, job_id: str):
+        await self.acquire(job_id)
+        try:
+            yield
+        finally:
+            self.release()
+
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_client: Optional[httpx.AsyncClient] = None
+_limiters: Dict[str, FairLimiter] = {}
+_start_lock = threading.Lock()
+
+
+def _ensure_loop() -> asyncio.AbstractEventLoop:
+    global _loop, _client
+    with _start_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="acquisition-engine", daemon=True).start()
+            _client = http_client.create_async_client()
+            _limiters.update({
+                "search": FairLimiter(ACQUISITION_MAX_SEARCHES),
+                "download": FairLimiter(ACQUISITION_MAX_DOWNLOADS),
+            })
+            _loop = loop
+        return _loop
+
+
+def _run(coro):
+    return asyncio.run_coroutine_threadsafe(coro, _ensure_loop()).result()
+
+
+async def _search(keyword: str, per_keyword: int, job_id: str) -> List[Dict]:
+    async with _limiters["search"].slot(job_id):
+        return await search_pexels(_client, keyword, per_keyword)
+
+
+async def _download(index: int, asset: Dict, project_dir: Path, window: Optional[float], job_id: str) -> Optional[str]:
+    async with _limiters["download"].slot(job_id):
+        path = await download_asset(_client, index, asset, project_dir, window)
+    if path:
+        print(f"✓ Downloaded: {os.path.basename(path)}")
+    return path
+
+
+def _interleave_by_keyword(keywords: List[str], searches: List) -> List[Dict]:
+    unique_ids = set()
+    per_keyword = []
+    for keyword, result in zip(keywords, searches):
+        if isinstance(result, Exception):
+            print(f"Search for '{keyword}' failed: {result}")
+            continue
+        fresh = []
+        for asset in result:
+            if asset['id'] not in unique_ids:
+                unique_ids.add(asset['id'])
+                fresh.append({**asset, "keyword": keyword})
+        if fresh:
+            per_keyword.append(fresh)
+
+    ordered = []
+    for rank in range(max((len(group) for group in per_keyword), default=0)):
+        ordered.extend(group[rank] for group in per_keyword if rank < len(group))
+    return ordered
+
+
+async def _gather_stock(keywords: List[str], per_keyword: int, project_dir: Path, window: Optional[float],
+                        needed: Optional[int], job_id: str) -> List[str]:
+    searches = await asyncio.gather(*(_search(k, per_keyword, job_id) for k in keywords), return_exceptions=True)
+    candidates = _interleave_by_keyword(keywords, searches)
+    if not candidates:
+        return []
+
+    needed = min(needed or len(candidates), len(candidates))
+    diversity = min(STOCK_MIN_KEYWORD_DIVERSITY, len({asset["keyword"] for asset in candidates}))
+    tasks = {
+        asyncio.ensure_future(_download(i, asset, project_dir, window, job_id)): (i, asset)
+        for i, asset in enumerate(candidates)
+    }
+
+    downloaded, covered = [], set()
+    pending = set(tasks)
+    try:
+        while pending and not (len(downloaded) >= needed and len(covered) >= diversity):
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                path = None if task.cancelled() or task.exception() else task.result()
+                if path:
+                    rank, asset = tasks[task]
+                    downloaded.append((rank, path))
+                    covered.add(asset["keyword"])
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            print(f"Enough stock assets ({len(downloaded)}/{needed}); cancelled {len(pending)} remaining downloads.")
+
+    return [path for _, path in sorted(downloaded)]
+
+
+async def _generate_images(prompts: List[str], project_dir: Path, style_preset: str) -> List[Optional[str]]:
+    seen: Dict[str, int] = {}
+    seeds = []
+    for prompt in prompts:
+        seeds.append(seen.get(prompt, 0))
+        seen[prompt] = seeds[-1] + 1
+    return list(await asyncio.gather(
+        *(generate_stability_image(_client, prompt, i, project_dir, style_preset, seed)
+          for i, (prompt, seed) in enumerate(zip(prompts, seeds)))
+    ))
+
+
+def gather_stock_assets(keywords: List[str], per_keyword: int, project_dir: Path, window: Optional[float] = None,
+                        needed: Optional[int] = None) -> List[str]:
+    return _run(_gather_stock(keywords, per_keyword, project_dir, window, needed, project_dir.name))
+
+
+def generate_images(prompts: List[str], project_dir: Path, style_preset: str) -> List[Optional[str]]:
+    return _run(_generate_images(prompts, project_dir, style_preset))
@@ -1,137 +1,103 @@
 import math
-import random
-import concurrent.futures
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, List, Optional
 
-from moviepy import AudioFileClip
-from PIL import Image, ImageDraw
-
-from config import IMAGE_BUFFER_COUNT, INTRO_CLIPS_COUNT, INTRO_CLIP_DURATION, MAX_IMAGE_WORKERS
-from core.models import VideoSettings, AssetGenerationError
-from services.stability_service import generate_stability_image
-from services.stock_service import search_pexels, download_assets_parallel
+from config import VIDEO_WIDTH, VIDEO_HEIGHT, STOCK_WINDOW_PADDING_SECONDS, AI_FALLBACK_MODE, STOCK_FALLBACK_MODE, FALLBACK_VARIANT
+from core.models import AssetGenerationError
+from repositories.asset_repository import sample_cached_assets, link_asset
+from services.acquisition_engine import gather_stock_assets, generate_images
+from services.stability_service import stability_breaker
+from services.stock_service import pexels_breaker, media_breaker
+from services.timeline_service import Timeline
+from utils.fallback_media import fallback_media_path
 from utils.stock_search import generate_smart_keywords
 
 def gather_visuals(
     generation_mode: str, video_type: str, category: str, script: str, topic: str,
-    project_dir: Path, audio_path: str, video_settings: VideoSettings,
-    ai_provider: str, style_preset: str
+    project_dir: Path, timeline: Timeline,
+    ai_provider: str, style_preset: str,
+    keywords: Optional[List[str]] = None, image_prompts: Optional[List[str]] = None
 ) -> List[str]:
     if generation_mode == 'stability':
-        images_needed = _calculate_images_needed(audio_path, video_settings)
-        return _generate_stability_parallel(script, topic, images_needed, project_dir, style_preset)
+        if AI_FALLBACK_MODE == 'stock' and stability_breaker.is_open():
+            print("⚡ Stability API is unavailable, using stock footage instead")
+        else:
+            return _generate_stability_parallel(script, topic, len(timeline), project_dir, style_preset, image_prompts,
+                                                lambda count: _gather_stock_visuals(script, topic, timeline, project_dir, keywords, count))
     
-    return _gather_stock_visuals(script, topic, audio_path, video_settings, project_dir)
+    return _gather_stock_visuals(script, topic, timeline, project_dir, keywords)
 
-def _generate_stability_parallel(script: str, topic: str, images_needed: int, project_dir: Path, style_preset: str) -> List[str]:
+def _generate_stability_parallel(script: str, topic: str, images_needed: int, project_dir: Path, style_preset: str,
+                                 image_prompts: Optional[List[str]] = None, stock_fallback: Optional[Callable[[int], List[str]]] = None) -> List[str]:
     print(f"Generating {images_needed} SD 3.5 Large Turbo images in parallel...")
     paragraphs = [p.strip() for p in script.split('\n\n') if p.strip()]
     if not paragraphs: 
         paragraphs = [script]
     
-    tasks = []
-    for i in range(images_needed):
+    prompts = list(image_prompts or [])[:images_needed]
+    for i in range(len(prompts), images_needed):
         paragraph = paragraphs[i % len(paragraphs)]
-        prompt = f"Educational illustration of '{topic}' related to '{paragraph[:100]}'. Cinematic, high detail, photorealistic."
-        tasks.append((prompt, i, project_dir, style_preset))
+        prompts.append(f"Educational illustration of '{topic}' related to '{paragraph[:100]}'. Cinematic, high detail, photorealistic.")
         
-    assets = _execute_parallel_generation(tasks, project_dir)
-    print(f"Generated {len(assets)} images using SD 3.5 Large Turbo.")
-    return assets
-
-def _execute_parallel_generation(tasks: List[tuple], project_dir: Path) -> List[str]:
-    assets = [None] * len(tasks)
-    tasks_map = {i: task for i, task in enumerate(tasks)}
+    assets = generate_images(prompts, project_dir, style_preset)
+    failed = [index for index, asset in enumerate(assets) if not asset]
+    if failed:
+        print(f"{len(failed)} images failed after retries. Using fallbacks.")
+    replacements = []
+    if failed and stock_fallback and AI_FALLBACK_MODE == 'stock' and stability_breaker.state != 'closed':
+        replacements = stock_fallback(len(failed))
+    for index in failed:
+        assets[index] = replacements.pop() if replacements else create_fallback_asset(index, project_dir)
 
-    for attempt in range(3):
-        if not tasks_map:
-            break
-        
-        print(f"--- Generation Attempt #{attempt + 1} for {len(tasks_map)} images ---")
-        
-        with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_IMAGE_WORKERS) as executor:
-            future_to_index = {}
-            for index, task in tasks_map.items():
-                future = executor.submit(generate_stability_image, *task)
-                future_to_index[future] = index
-
-            for future in concurrent.futures.as_completed(future_to_index):
-                index = future_to_index[future]
-                asset_path = future.result()
-                
-                if asset_path:
-                    assets[index] = asset_path
-                    if index in tasks_map:
-                        del tasks_map[index]
-
-        if tasks_map and attempt < 2:
-            print(f"{len(tasks_map)} tasks failed. Retrying...")
-            
-    for index in tasks_map.keys():
-        assets[index] = create_fallback_image(index, project_dir)
-        
-    return [asset for asset in assets if asset]
+    print(f"Generated {len(assets) - len(failed)} images using SD 3.5 Large Turbo.")
+    return assets
 
-def _gather_stock_visuals(script: str, topic: str, audio_path: str, video_settings: VideoSettings, project_dir: Path) -> List[str]:
-    images_needed = _calculate_images_needed(audio_path, video_settings)
+def _gather_stock_visuals(script: str, topic: str, timeline: Timeline, project_dir: Path,
+                          keywords: Optional[List[str]] = None, images_needed: Optional[int] = None) -> List[str]:
+    images_needed = images_needed or len(timeline)
     num_keywords = 7
     assets_per_keyword = math.ceil((images_needed + 5) / num_keywords)
     
     print(f"Needing ~{images_needed} clips. Searching for {assets_per_keyword} assets from top {num_keywords} keywords.")
     
-    keywords = generate_smart_keywords(topic, script)
-    all_assets = []
-    
-    with concurrent.futures.ThreadPoolExecutor(max_workers=num_keywords) as executor:
-        future_to_search = {
-            executor.submit(search_pexels, keyword, assets_per_keyword): keyword 
-            for keyword in keywords[:num_keywords]
-        }
-        for future in concurrent.futures.as_completed(future_to_search):
-            try:
-                all_assets.extend(future.result())
-            except Exception as exc:
-                print(f"Search for '{future_to_search[future]}' failed: {exc}")
+    if not keywords:
+        keywords = generate_smart_keywords(topic, script)
+    window = timeline.longest_slot() + STOCK_WINDOW_PADDING_SECONDS
+    assets = gather_stock_assets(keywords[:num_keywords], assets_per_keyword, project_dir, window, images_needed)
 
-    unique_ids = set()
-    unique_assets = [asset for asset in all_assets if asset['id'] not in unique_ids and not unique_ids.add(asset['id'])]
-    
-    return download_assets_parallel(unique_assets, project_dir)
+    if len(assets) < images_needed and (not assets or pexels_breaker.state != 'closed' or media_breaker.state != 'closed'):
+        assets += _stock_fallback_assets(images_needed - len(assets), len(assets), project_dir)
+    return assets
 
-def _calculate_images_needed(audio_path: str, video_settings: VideoSettings) -> int:
-    audio_duration = 30
-    if Path(audio_path).exists():
-        try:
-            with AudioFileClip(str(audio_path)) as audio:
-                audio_duration = audio.duration
-        except Exception:
-            pass
+def _stock_fallback_assets(count: int, start_index: int, project_dir: Path) -> List[str]:
+    assets = []
+    if STOCK_FALLBACK_MODE == 'cached':
+        for blob_path in sample_cached_assets(count):
+            filepath = project_dir / "assets" / f"cached_{start_index + len(assets)}_{blob_path.name}"
+            if link_asset(blob_path, filepath):
+                assets.append(str(filepath))
+        if assets:
+            print(f"Reused {len(assets)} cached stock assets while Pexels is unavailable.")
 
-    intro_total_seconds = INTRO_CLIPS_COUNT * INTRO_CLIP_DURATION
+    while len(assets) < count:
+        assets.append(create_fallback_asset(start_index + len(assets), project_dir))
+    return assets
 
-    if audio_duration <= intro_total_seconds:
-        images_needed = math.ceil(audio_duration / INTRO_CLIP_DURATION)
-    else:
-        main_section_duration = audio_duration - intro_total_seconds
-        main_clips_needed = math.ceil(main_section_duration / video_settings.clip_duration)
-        images_needed = INTRO_CLIPS_COUNT + main_clips_needed
-    
-    return images_needed + IMAGE_BUFFER_COUNT
+def _link_fallback(index: int, project_dir: Path, variant: str) -> str:
+    for _ in range(2):
+        media_path = fallback_media_path(index, (VIDEO_WIDTH, VIDEO_HEIGHT), variant)
+        filepath = project_dir / "assets" / f"fallback_{index}_{media_path.stem[:8]}{media_path.suffix}"
+        if link_asset(media_path, filepath):
+            return str(filepath)
+    raise AssetGenerationError(f"Could not place fallback {variant} asset in {project_dir.name}")
 
 def create_fallback_image(index: int, project_dir: Path) -> str:
-    img = Image.new('RGB', (1920, 1080))
-    draw = ImageDraw.Draw(img)
-    colors = [((20, 20, 50), (50, 50, 100)), ((50, 20, 20), (100, 50, 50)), ((20, 50, 20), (50, 100, 50))]
-    start_color, end_color = colors[index % len(colors)]
-    for y in range(1080):
-        ratio = y / 1080
-        r = int(start_color[0] * (1 - ratio) + end_color[0] * ratio)
-        g = int(start_color[1] * (1 - ratio) + end_color[1] * ratio)
-        b = int(start_color[2] * (1 - ratio) + end_color[2] * ratio)
-        draw.rectangle([(0, y), (1920, y + 1)], fill=(r, g, b))
-    
-    filename = f"fallback_{index}_{random.randint(1000, 9999)}.jpg"
-    filepath = project_dir / "assets" / filename
-    img.save(filepath, quality=90)
-    return str(filepath)
\ No newline at end of file
+    return _link_fallback(index, project_dir, 'still')
+
+def create_fallback_asset(index: int, project_dir: Path) -> str:
+    if FALLBACK_VARIANT != 'still':
+        try:
+            return _link_fallback(index, project_dir, FALLBACK_VARIANT)
+        except Exception as e:
+            print(f"Could not build {FALLBACK_VARIANT} fallback clip ({e}), using a still instead")
+    return create_fallback_image(index, project_dir)
@@ -1,13 +1,24 @@
+import json
+import math
 import os
+import re
+import shutil
+import subprocess
+import concurrent.futures
+import imageio_ffmpeg
 import numpy as np
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterable, List, Optional, Tuple
 
-from moviepy import AudioFileClip, AudioClip, concatenate_audioclips
-from elevenlabs import generate
+from moviepy import AudioFileClip
 
-from config import SCRIPT_CHUNK_LIMIT
-from core.models import AudioGenerationError
+from client.elevenlabs_client import synthesize_cached
+from config import (
+    SCRIPT_CHUNK_LIMIT, TTS_CHUNK_TARGET_CHARS, ELEVENLABS_MAX_CONCURRENCY,
+    NARRATION_TARGET_PEAK, NORMALIZE_BLOCK_SAMPLES, NARRATION_ANALYSIS_WINDOW_SECONDS,
+    PAUSE_MIN_SECONDS, PAUSE_THRESHOLD_DB
+)
+from core.models import AudioGenerationError, ScriptGenerationError
 
 def generate_voiceover(script: str, project_dir: Path, video_type: str, voice_id: str, tts_model: str) -> str:
     audio_path = project_dir / "audio" / "narration.mp3"
@@ -29,76 +40,227 @@ def generate_voiceover(script: str, project_dir: Path, video_type: str, voice_id
     except Exception as e:
         raise AudioGenerationError(f"TTS generation failed: {e}")
 
+def generate_voiceover_streaming(paragraphs: Iterable[str], project_dir: Path, voice_id: str, tts_model: str) -> Tuple[str, str]:
+    audio_path = project_dir / "audio" / "narration.mp3"
+    audio_parts_dir = project_dir / "audio" / "parts"
+    audio_parts_dir.mkdir(exist_ok=True)
+    script_paragraphs = []
+    futures = []
+
+    try:
+        previous_text = None
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=ELEVENLABS_MAX_CONCURRENCY)
+        try:
+            for paragraph in paragraphs:
+                for chunk in _split_text_into_chunks(paragraph, TTS_CHUNK_TARGET_CHARS):
+                    part_path = audio_parts_dir / f"part_{len(futures)}.mp3"
+                    print(f"   - Paragraph {len(script_paragraphs) + 1} ready, dispatching narration part {len(futures) + 1}...")
+                    futures.append(executor.submit(_synthesize_part, chunk, part_path, voice_id, tts_model, previous_text))
+                    previous_text = chunk
+                script_paragraphs.append(paragraph)
+
+            part_files = [future.result() for future in futures]
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        if not part_files:
+            raise AudioGenerationError("Streamed script produced no narration")
+
+        _stitch_parts(part_files, audio_path, script_paragraphs)
+
+        with AudioFileClip(str(audio_path)) as audio_clip:
+            duration = audio_clip.duration
+        if duration < 1.0:
+            raise AudioGenerationError(f"Generated audio is too short: {duration}s")
+
+        print(f"Audio generated successfully: {duration:.1f}s ({len(part_files)} streamed parts)")
+        return '\n\n'.join(script_paragraphs), str(audio_path)
+
+    except (AudioGenerationError, ScriptGenerationError):
+        raise
+    except Exception as e:
+        raise AudioGenerationError(f"TTS generation failed: {e}")
+    finally:
+        _remove_parts_dir(audio_parts_dir)
+
+def _synthesize_part(text: str, part_path: Path, voice_id: str, tts_model: str,
+                     previous_text: Optional[str] = None, next_text: Optional[str] = None) -> str:
+    cached_path, _ = synthesize_cached(text, voice_id, tts_model, previous_text=previous_text, next_text=next_text)
+    shutil.copyfile(cached_path, part_path)
+    return str(part_path)
+
+def _stitch_parts(audio_part_files: List[str], audio_path: Path, paragraphs: List[str]) -> None:
+    if len(audio_part_files) == 1:
+        os.rename(audio_part_files[0], audio_path)
+    else:
+        print("Stitching ElevenLabs audio chunks together...")
+        list_path = audio_path.with_suffix(".concat.txt")
+        list_path.write_text(''.join(f"file '{Path(file).resolve()}'\n" for file in audio_part_files))
+        try:
+            subprocess.run([
+                imageio_ffmpeg.get_ffmpeg_exe(), "-nostdin", "-loglevel", "error", "-y",
+                "-f", "concat", "-safe", "0", "-i", str(list_path), "-c", "copy", str(audio_path)
+            ], check=True, capture_output=True)
+        finally:
+            list_path.unlink(missing_ok=True)
+
+    _analyze_narration(audio_path, paragraphs)
+
+def _gain_sidecar_path(audio_path: Path) -> Path:
+    return audio_path.with_suffix(".gain.json")
+
+def _timing_sidecar_path(audio_path: Path) -> Path:
+    return audio_path.with_suffix(".timing.json")
+
+def _analyze_narration(audio_path: Path, paragraphs: List[str]) -> None:
+    peak, rms, window_rms = _scan_levels(["-i", str(audio_path)])
+    gain = NARRATION_TARGET_PEAK / peak if peak > 0 else 1.0
+    print(f"Narration levels: peak {_dbfs(peak):.1f} dBFS, RMS {_dbfs(rms):.1f} dBFS, {_dbfs(gain):+.1f} dB applied at render")
+    _gain_sidecar_path(audio_path).write_text(json.dumps({"peak": peak, "rms": rms, "gain": gain}))
+
+    duration = len(window_rms) * NARRATION_ANALYSIS_WINDOW_SECONDS
+    pauses = _detect_pauses(window_rms, rms * 10 ** (PAUSE_THRESHOLD_DB / 20))
+    _timing_sidecar_path(audio_path).write_text(json.dumps({
+        "duration": round(duration, 3),
+        "pauses": pauses,
+        "paragraphs": _align_paragraphs(paragraphs, pauses, duration),
+    }))
+    print(f"Narration timing: {len(pauses)} pauses over {duration:.1f}s")
+
+def _detect_pauses(window_rms: np.ndarray, threshold: float) -> List[List[float]]:
+    quiet = np.concatenate(([0], (window_rms < threshold).astype(np.int8), [0]))
+    edges = np.flatnonzero(np.diff(quiet))
+    starts, ends = edges[0::2], edges[1::2]
+    keep = (ends - starts) * NARRATION_ANALYSIS_WINDOW_SECONDS >= PAUSE_MIN_SECONDS
+    keep &= (starts > 0) & (ends < len(window_rms))
+    return [
+        [round(start * NARRATION_ANALYSIS_WINDOW_SECONDS, 3), round(end * NARRATION_ANALYSIS_WINDOW_SECONDS, 3)]
+        for start, end in zip(starts[keep], ends[keep])
+    ]
+
+def _align_paragraphs(paragraphs: List[str], pauses: List[List[float]], duration: float) -> List[Dict]:
+    if not paragraphs or len(pauses) < len(paragraphs) - 1:
+        return []
+    longest = sorted(pauses, key=lambda pause: pause[1] - pause[0], reverse=True)[:len(paragraphs) - 1]
+    bounds = [0.0] + sorted(round((start + end) / 2, 3) for start, end in longest) + [round(duration, 3)]
+    return [
+        {"start": bounds[i], "end": bounds[i + 1], "text": text}
+        for i, text in enumerate(paragraphs)
+    ]
+
+def narration_gain(audio_path: str) -> float:
+    try:
+        return float(json.loads(_gain_sidecar_path(Path(audio_path)).read_text())["gain"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return 1.0
+
+def load_timing_map(audio_path: str) -> Optional[Dict]:
+    try:
+        return json.loads(_timing_sidecar_path(Path(audio_path)).read_text())
+    except (OSError, ValueError):
+        return None
+
+def _dbfs(value: float) -> float:
+    return 20 * math.log10(value) if value > 0 else float('-inf')
+
+def _scan_levels(input_args: List[str]) -> Tuple[float, float, np.ndarray]:
+    window = int(44100 * NARRATION_ANALYSIS_WINDOW_SECONDS) * 2
+    process = subprocess.Popen(
+        [imageio_ffmpeg.get_ffmpeg_exe(), "-nostdin", "-loglevel", "error", *input_args,
+         "-ac", "2", "-ar", "44100", "-f", "f32le", "-acodec", "pcm_f32le", "-"],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+    )
+    peak, sum_squares, samples = 0.0, 0.0, 0
+    window_rms = []
+    block_bytes = max(1, NORMALIZE_BLOCK_SAMPLES // window) * window * 4
+    try:
+        while True:
+            data = process.stdout.read(block_bytes)
+            if not data:
+                break
+            block = np.frombuffer(data[:len(data) - len(data) % 4], dtype=np.float32)
+            if not block.size:
+                continue
+            squares = np.square(block, dtype=np.float64)
+            peak = max(peak, float(np.max(np.abs(block))))
+            sum_squares += float(squares.sum())
+            samples += block.size
+            padded = np.pad(squares, (0, -len(squares) % window))
+            window_rms.append(np.sqrt(padded.reshape(-1, window).mean(axis=1)))
+    finally:
+        process.stdout.close()
+        if process.wait() != 0:
+            raise AudioGenerationError("Could not decode narration to measure levels")
+    rms = math.sqrt(sum_squares / samples) if samples else 0.0
+    return peak, rms, np.concatenate(window_rms) if window_rms else np.zeros(0)
+
+def _remove_parts_dir(audio_parts_dir: Path) -> None:
+    if audio_parts_dir.exists():
+        for part_file in audio_parts_dir.glob("*.mp3"):
+            try:
+                os.remove(part_file)
+            except:
+                pass
+        try:
+            os.rmdir(audio_parts_dir)
+        except:
+            pass
+
 def _generate_voiceover_elevenlabs(script: str, audio_path: Path, project_dir: Path, voice_id: str, tts_model: str) -> None:
     audio_parts_dir = project_dir / "audio" / "parts"
     audio_parts_dir.mkdir(exist_ok=True)
-    script_chunks = _split_text_into_chunks(script, SCRIPT_CHUNK_LIMIT)
-    audio_part_files = []
+    script_chunks = _split_text_into_chunks(script, TTS_CHUNK_TARGET_CHARS)
     
     if len(script_chunks) > 1:
-        print(f"Script is long, splitting into {len(script_chunks)} chunks for ElevenLabs.")
+        print(f"Synthesizing {len(script_chunks)} narration chunks in parallel...")
     
-    clips = []
     try:
-        for i, chunk in enumerate(script_chunks):
-            print(f"   - Generating audio for chunk {i+1}/{len(script_chunks)}...")
-            audio_data = generate(text=chunk, voice=voice_id, model=tts_model)
-            part_path = audio_parts_dir / f"part_{i}.mp3"
-            with open(part_path, 'wb') as f:
-                f.write(audio_data)
-            audio_part_files.append(str(part_path))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(len(script_chunks), ELEVENLABS_MAX_CONCURRENCY) or 1) as executor:
+            futures = [
+                executor.submit(
+                    _synthesize_part, chunk, audio_parts_dir / f"part_{i}.mp3", voice_id, tts_model,
+                    script_chunks[i - 1] if i > 0 else None,
+                    script_chunks[i + 1] if i + 1 < len(script_chunks) else None
+                )
+                for i, chunk in enumerate(script_chunks)
+            ]
+            audio_part_files = [future.result() for future in futures]
         
-        if len(audio_part_files) > 1:
-            print("Stitching ElevenLabs audio chunks together...")
-            clips = [AudioFileClip(file) for file in audio_part_files]
-            final_audio = concatenate_audioclips(clips)
-            final_audio = audio_normalize(final_audio)
-            final_audio.write_audiofile(str(audio_path), codec='mp3')
-            final_audio.close()
-        else:
-            os.rename(audio_part_files[0], audio_path)
+        _stitch_parts(audio_part_files, audio_path, [p.strip() for p in re.split(r'\n\s*\n', script) if p.strip()])
     finally:
-        for clip in clips:
-            try:
-                clip.close()
-            except:
-                pass
-        if audio_parts_dir.exists():
-            for part_file in audio_parts_dir.glob("*.mp3"):
-                try:
-                    os.remove(part_file)
-                except:
-                    pass
-            try:
-                os.rmdir(audio_parts_dir)
-            except:
-                pass
+        _remove_parts_dir(audio_parts_dir)
+
+def _split_long_text(text: str, limit: int) -> List[str]:
+    pieces = []
+    while len(text) > limit:
+        split_pos = text.rfind(' ', 0, limit)
+        if split_pos <= 0:
+            split_pos = limit
+        pieces.append(text[:split_pos])
+        text = text[split_pos:].lstrip()
+    pieces.append(text)
+    return pieces
+
+def _split_text_into_chunks(text: str, target_chars: int) -> List[str]:
+    limit = min(max(target_chars, 1), SCRIPT_CHUNK_LIMIT)
+    units = []
+    for paragraph in re.split(r'\n\s*\n', text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        sentences = [paragraph] if len(paragraph) <= limit else re.split(r'(?<=[.!?])\s+', paragraph)
+        for i, sentence in enumerate(sentences):
+            for j, piece in enumerate(_split_long_text(sentence, limit)):
+                units.append((piece, "\n\n" if i == 0 and j == 0 else " "))
 
-def _split_text_into_chunks(text: str, chunk_limit: int) -> List[str]:
     chunks = []
-    while len(text) > chunk_limit:
-        split_pos = text.rfind('.', 0, chunk_limit)
-        if split_pos == -1: split_pos = text.rfind('?', 0, chunk_limit)
-        if split_pos == -1: split_pos = text.rfind('!', 0, chunk_limit)
-        if split_pos == -1: split_pos = text.rfind(' ', 0, chunk_limit)
-        if split_pos == -1: split_pos = chunk_limit
-        chunk = text[:split_pos+1]
-        chunks.append(chunk)
-        text = text[split_pos+1:]
-    chunks.append(text)
+    current = ""
+    for unit, separator in units:
+        if current and len(current) + len(separator) + len(unit) > limit:
+            chunks.append(current)
+            current = unit
+        else:
+            current = f"{current}{separator}{unit}" if current else unit
+    if current:
+        chunks.append(current)
     return [c.strip() for c in chunks if c.strip()]
-
-def audio_normalize(audio_clip):
-    try:
-        audio_array = audio_clip.to_soundarray(fps=44100)
-        max_val = np.max(np.abs(audio_array))
-        if max_val > 0:
-            audio_array = audio_array / max_val * 0.9
-        return AudioClip(
-            lambda t: audio_array[int(t * 44100)] if int(t * 44100) < len(audio_array) else 0,
-            duration=audio_clip.duration,
-            fps=44100
-        )
-    except Exception as e:
-        print(f"Audio normalization failed: {e}")
-        return audio_clip
\ No newline at end of file
@@ -0,0 +1,145 @@
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from config import (
+    OUTPUT_DIR, HEARTBEAT_TIMEOUT_SECONDS, RECONCILE_INTERVAL_SECONDS,
+    RECONCILE_REQUEUE, RECONCILE_MAX_ATTEMPTS, ORPHAN_GRACE_SECONDS
+)
+from core.generator import VideoGenerator
+from core.models import GenerationConfig
+from repositories.file_repository import delete_video_project
+from repositories.progress_repository import (
+    load_generating_videos, get_stale_generations, mark_videos_completed, remove_generating_videos
+)
+from utils.resource_monitor import ResourceMonitor
+
+ORPHAN_FILE_PATTERNS = ('temp-audio-*.m4a', '*.tmp')
+
+_reconciler_lock = threading.Lock()
+_reconciler_thread = None
+
+
+def start_reconciler():
+    global _reconciler_thread
+    with _reconciler_lock:
+        if _reconciler_thread and _reconciler_thread.is_alive():
+            return
+        _reconciler_thread = threading.Thread(target=_reconcile_loop, name="state-reconciler", daemon=True)
+        _reconciler_thread.start()
+
+
+def _reconcile_loop():
+    while True:
+        try:
+            reconcile_generation_state()
+        except Exception as e:
+            print(f"State reconciliation failed: {e}")
+        time.sleep(RECONCILE_INTERVAL_SECONDS)
+
+
+def _is_project_complete(project_dir: Path) -> bool:
+    return (project_dir / "final_video.mp4").exists() and (project_dir / "youtube_metadata.json").exists()
+
+
+def _is_aborted_job(project_dir: Path) -> bool:
+    if (project_dir / "final_video.mp4").exists():
+        return False
+    return (project_dir / ".progress.json").exists() or (project_dir / "audio" / "parts").is_dir()
+
+
+def _remove_orphan_files(project_dir: Path) -> int:
+    removed = 0
+    for pattern in ORPHAN_FILE_PATTERNS:
+        for orphan in project_dir.rglob(pattern):
+            try:
+                orphan.unlink()
+                removed += 1
+            except OSError:
+                pass
+
+    parts_dir = project_dir / "audio" / "parts"
+    if parts_dir.exists():
+        shutil.rmtree(parts_dir, ignore_errors=True)
+        removed += 1
+
+    progress_file = project_dir / ".progress.json"
+    if progress_file.exists():
+        progress_file.unlink(missing_ok=True)
+        removed += 1
+
+    return removed
+
+
+def _requeue(project_name: str, config_data: Dict) -> bool:
+    try:
+        config = GenerationConfig(**config_data)
+    except TypeError as e:
+        print(f"Cannot re-queue job, stored config is invalid: {e}")
+        return False
+
+    if config.attempt >= RECONCILE_MAX_ATTEMPTS:
+        return False
+
+    config.attempt += 1
+    config.progress_id = f"{config.video_type}_{config.category}_{int(time.time())}"
+    shutil.rmtree(OUTPUT_DIR / project_name, ignore_errors=True)
+    generator = VideoGenerator(config)
+    generator.register()
+    threading.Thread(target=generator.generate, daemon=True).start()
+    print(f"🔁 Re-queued '{config.topic}' (attempt {config.attempt})")
+    return True
+
+
+def reconcile_generation_state() -> Dict[str, List[str]]:
+    dead_jobs = get_stale_generations(HEARTBEAT_TIMEOUT_SECONDS)
+    finalized_topics, finalized, failed, requeue = [], [], [], []
+
+    for project_name, info in dead_jobs.items():
+        project_dir = OUTPUT_DIR / project_name
+        if _is_project_complete(project_dir):
+            finalized.append(project_name)
+            if info.get("topic"):
+                finalized_topics.append(info["topic"])
+        elif RECONCILE_REQUEUE and info.get("config"):
+            requeue.append((project_name, info["config"]))
+        else:
+            failed.append(project_name)
+
+    deferred = set()
+    if requeue and not ResourceMonitor.can_start_new_video():
+        deferred = {project_name for project_name, _ in requeue}
+        print(f"System busy, deferring {len(deferred)} re-queued jobs to the next pass")
+        requeue = []
+
+    if finalized_topics:
+        mark_videos_completed(finalized_topics)
+    if dead_jobs:
+        remove_generating_videos(name for name in dead_jobs if name not in deferred)
+
+    for project_name in failed:
+        delete_video_project(project_name)
+
+    requeued_names = {project_name for project_name, config_data in requeue if _requeue(project_name, config_data)}
+    requeued = [config_data.get("topic") for project_name, config_data in requeue if project_name in requeued_names]
+
+    cleaned = 0
+    if OUTPUT_DIR.exists():
+        active = set(load_generating_videos()) | requeued_names | deferred
+        grace_cutoff = time.time() - ORPHAN_GRACE_SECONDS
+        for project_dir in OUTPUT_DIR.iterdir():
+            if not project_dir.is_dir() or project_dir.name in active:
+                continue
+            if _is_project_complete(project_dir):
+                cleaned += _remove_orphan_files(project_dir)
+            elif _is_aborted_job(project_dir) and project_dir.stat().st_mtime < grace_cutoff:
+                if delete_video_project(project_dir.name):
+                    failed.append(project_dir.name)
+
+    if dead_jobs or cleaned or failed:
+        print(f"🩺 Reconciled state: {len(finalized)} finalized, {len(requeued)} re-queued, "
+              f"{len(failed)} cleaned up, {cleaned} orphaned files removed")
+
+    return {"finalized": finalized, "requeued": requeued, "failed": failed}
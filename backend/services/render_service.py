@@ -2,19 +2,19 @@ import os
 import gc
 import random
 from pathlib import Path
-from typing import List
 from contextlib import contextmanager
 
 from moviepy import AudioFileClip, CompositeVideoClip, VideoFileClip, ImageClip
 from PIL import Image
 
 from config import (
-    VIDEO_WIDTH, VIDEO_HEIGHT, FPS, VIDEO_ENCODING_THREADS, 
-    ENCODING_PRESET, INTRO_CLIPS_COUNT, INTRO_CLIP_DURATION
+    VIDEO_WIDTH, VIDEO_HEIGHT, FPS, VIDEO_ENCODING_THREADS, ENCODING_PRESET
 )
-from core.models import VideoSettings, RenderError
+from core.models import RenderError
 from services.stability_service import generate_ai_thumbnail_image
-from services.asset_service import create_fallback_image
+from services.asset_service import create_fallback_image, create_fallback_asset
+from services.audio_service import narration_gain
+from services.timeline_service import Timeline, VIDEO_EXTENSIONS, IMAGE_EXTENSIONS
 
 
 @contextmanager
@@ -46,7 +46,7 @@ def managed_image(image):
             print(f"Warning: Error closing image: {e}")
 
 
-def render_video_simple(assets: List[str], audio_path: str, project_dir: Path, video_settings: VideoSettings) -> str:
+def render_video_simple(timeline: Timeline, audio_path: str, project_dir: Path) -> str:
     print("🎬 Rendering video with variable intro pacing...")
     clips = []
     opened_resources = []
@@ -58,81 +58,78 @@ def render_video_simple(assets: List[str], audio_path: str, project_dir: Path, v
         total_duration = audio.duration
         print(f"Target duration: {total_duration:.1f}s")
 
-        valid_assets = sorted(
-            [a for a in assets if a and os.path.exists(a)],
-            key=lambda p: _extract_index_from_filename(p)
-        )
-
-        if not valid_assets:
+        timeline.fit_to(total_duration)
+        asset_sequence = timeline.asset_paths(project_dir)
+        if not any(os.path.exists(a) for a in asset_sequence):
             print("No valid assets found! Using fallbacks.")
-            valid_assets = [create_fallback_image(i, project_dir) for i in range(10)]
-        
-        video_assets = [a for a in valid_assets if a.lower().endswith(('.mp4', '.mov', '.avi'))]
-        image_assets = [a for a in valid_assets if a.lower().endswith(('.png', '.jpg', '.jpeg'))]
-        asset_sequence = video_assets + image_assets
+            timeline.assign([create_fallback_asset(i, project_dir) for i in range(10)], project_dir)
+            asset_sequence = timeline.asset_paths(project_dir)
+        print(f"Timeline: {len(timeline)} clips for {len(asset_sequence)} assets")
 
-        current_time = 0.0
-        clip_number = 0
-        
-        while current_time < total_duration and asset_sequence:
-            if clip_number < INTRO_CLIPS_COUNT:
-                target_duration = INTRO_CLIP_DURATION
-            else:
-                target_duration = video_settings.clip_duration
-            
-            clip_duration = min(target_duration, total_duration - current_time)
-            asset_path = asset_sequence[clip_number % len(asset_sequence)]
-            
-            clip = None
-            try:
-                if asset_path.lower().endswith(('.mp4', '.mov', '.avi')):
-                    clip = VideoFileClip(asset_path)
-                    opened_resources.append(clip)
+        for index in range(len(timeline)):
+            slot_start, slot_end = timeline.slot(index)
+            clip_duration = slot_end - slot_start
+            first = max(0, timeline.sources[index])
+            for offset in range(len(asset_sequence)):
+                asset_path = asset_sequence[(first + offset) % len(asset_sequence)]
+                in_point = timeline.in_points[index] if offset == 0 else -1.0
+                clip = None
+                try:
+                    if asset_path.lower().endswith(VIDEO_EXTENSIONS):
+                        clip = VideoFileClip(asset_path)
+                        opened_resources.append(clip)
                     
-                    if clip.duration > clip_duration:
-                        start = random.uniform(0, max(0, clip.duration - clip_duration))
-                        clip = clip.subclipped(start, min(start + clip_duration, clip.duration))
-                    elif clip.duration < clip_duration:
-                        try:
-                            clip = clip.looped(duration=clip_duration)
-                        except AttributeError:
-                            times_to_loop = int(clip_duration / clip.duration) + 1
-                            from moviepy import concatenate_videoclips
-                            clip = concatenate_videoclips([clip] * times_to_loop).subclipped(0, clip_duration)
-                else:
-                    clip = ImageClip(asset_path).with_duration(clip_duration)
+                        if clip.duration > clip_duration:
+                            if not 0 <= in_point <= clip.duration - clip_duration:
+                                in_point = random.uniform(0, max(0, clip.duration - clip_duration))
+                            clip = clip.subclipped(in_point, min(in_point + clip_duration, clip.duration))
+                        else:
+                            in_point = 0.0
+                            if clip.duration < clip_duration:
+                                try:
+                                    clip = clip.looped(duration=clip_duration)
+                                except AttributeError:
+                                    times_to_loop = int(clip_duration / clip.duration) + 1
+                                    from moviepy import concatenate_videoclips
+                                    clip = concatenate_videoclips([clip] * times_to_loop).subclipped(0, clip_duration)
+                    else:
+                        in_point = 0.0
+                        clip = ImageClip(asset_path).with_duration(clip_duration)
                 
-                target_ratio = VIDEO_WIDTH / VIDEO_HEIGHT
-                clip_ratio = clip.w / clip.h
+                    target_ratio = VIDEO_WIDTH / VIDEO_HEIGHT
+                    clip_ratio = clip.w / clip.h
 
-                if clip_ratio > target_ratio:
-                    resized_clip = clip.resized(height=VIDEO_HEIGHT)
-                else:
-                    resized_clip = clip.resized(width=VIDEO_WIDTH)
+                    if clip_ratio > target_ratio:
+                        resized_clip = clip.resized(height=VIDEO_HEIGHT)
+                    else:
+                        resized_clip = clip.resized(width=VIDEO_WIDTH)
 
-                final_clip = resized_clip.cropped(
-                    x_center=resized_clip.w / 2,
-                    y_center=resized_clip.h / 2,
-                    width=VIDEO_WIDTH,
-                    height=VIDEO_HEIGHT
-                )
+                    final_clip = resized_clip.cropped(
+                        x_center=resized_clip.w / 2,
+                        y_center=resized_clip.h / 2,
+                        width=VIDEO_WIDTH,
+                        height=VIDEO_HEIGHT
+                    )
                 
-                clips.append(final_clip.with_start(current_time))
-                current_time += clip_duration
-                clip_number += 1
+                    clips.append(final_clip.with_start(slot_start))
+                    timeline.set_source(index, asset_path, project_dir, in_point)
+                    break
 
-            except Exception as e:
-                print(f"Skipping broken asset {os.path.basename(asset_path)}: {e}")
-                if clip and hasattr(clip, 'close'):
-                    try:
-                        clip.close()
-                    except:
-                        pass
-                clip_number += 1
-                continue
+                except Exception as e:
+                    print(f"Skipping broken asset {os.path.basename(asset_path)}: {e}")
+                    if clip and hasattr(clip, 'close'):
+                        try:
+                            clip.close()
+                        except:
+                            pass
         
         if not clips:
             raise RenderError("No valid clips could be processed")
+        timeline.save(project_dir)
+
+        gain = narration_gain(audio_path)
+        if abs(gain - 1.0) > 0.001:
+            audio = audio.with_volume_scaled(gain)
 
         video = CompositeVideoClip(
             clips, 
@@ -184,7 +181,7 @@ def render_video_simple(assets: List[str], audio_path: str, project_dir: Path, v
 
 
 def generate_thumbnail(
-    assets: List[str], 
+    timeline: Timeline, 
     topic: str, 
     script: str, 
     project_dir: Path, 
@@ -209,7 +206,7 @@ def generate_thumbnail(
         video_clip = None
         try:
             with managed_clip(VideoFileClip(str(final_video_path))) as video_clip:
-                frame_time = min(video_clip.duration * 0.25, video_clip.duration - 0.1)
+                frame_time = min(_thumbnail_frame_time(timeline), video_clip.duration - 0.1)
                 if frame_time > 0:
                     frame = video_clip.get_frame(frame_time)
                     with managed_image(Image.fromarray(frame)) as base_image:
@@ -226,9 +223,10 @@ def generate_thumbnail(
                 except:
                     pass
 
-    image_assets = [a for a in assets if a and a.lower().endswith(('.png', '.jpg', '.jpeg'))]
+    image_assets = [a for a in timeline.asset_paths(project_dir) if a.lower().endswith(IMAGE_EXTENSIONS) and os.path.exists(a)]
     if image_assets:
-        selected_asset = random.choice(image_assets)
+        planned = timeline.asset_path(timeline.slot_at(_thumbnail_frame_time(timeline)), project_dir) if len(timeline) else None
+        selected_asset = planned if planned in image_assets else random.choice(image_assets)
         try:
             with managed_image(Image.open(selected_asset)) as img:
                 img = img.resize((1280, 720), Image.Resampling.LANCZOS).convert("RGB")
@@ -254,10 +252,8 @@ def generate_thumbnail(
     return str(thumbnail_dest_path)
 
 
-def _extract_index_from_filename(filepath: str) -> int:
-    basename = os.path.basename(filepath)
-    parts = basename.split('_')
-    for part in parts:
-        if part.isdigit():
-            return int(part)
-    return 0
\ No newline at end of file
+def _thumbnail_frame_time(timeline: Timeline) -> float:
+    if not len(timeline):
+        return timeline.duration * 0.25
+    slot_start, slot_end = timeline.slot(timeline.slot_at(timeline.duration * 0.25))
+    return (slot_start + slot_end) / 2
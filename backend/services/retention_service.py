@@ -0,0 +1,180 @@
+import os
+import queue
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from PIL import Image
+
+from config import (
+    OUTPUT_DIR, ASSET_RETENTION_POLICY, RETENTION_IMAGE_FORMAT, RETENTION_IMAGE_QUALITY,
+    RETENTION_MAX_AGE_DAYS, RETENTION_MAX_STORAGE_GB, RETENTION_INTERVAL_SECONDS, RETENTION_THROTTLE_SECONDS
+)
+from repositories.asset_repository import releasing_assets
+from repositories.file_repository import get_folder_size, get_video_duration, delete_video_project
+from repositories.progress_repository import load_generating_videos
+from services.timeline_service import Timeline
+
+COMPACTED_MARKER = ".compacted"
+AI_IMAGE_PREFIXES = ('sd35_',)
+RAW_IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+_compaction_queue = queue.Queue()
+_worker_lock = threading.Lock()
+_worker_thread = None
+
+
+def schedule_compaction(project_dir: Path):
+    if ASSET_RETENTION_POLICY != 'keep':
+        _compaction_queue.put(Path(project_dir))
+
+
+def start_retention_worker():
+    global _worker_thread
+    with _worker_lock:
+        if _worker_thread and _worker_thread.is_alive():
+            return
+        _worker_thread = threading.Thread(target=_retention_loop, name="retention-worker", daemon=True)
+        _worker_thread.start()
+
+
+def _retention_loop():
+    next_sweep = time.time() + 60
+    while True:
+        try:
+            project_dir = _compaction_queue.get(timeout=max(0.0, next_sweep - time.time()))
+            compact_project(project_dir)
+        except queue.Empty:
+            try:
+                run_retention_sweep()
+            except Exception as e:
+                print(f"Retention sweep failed: {e}")
+            next_sweep = time.time() + RETENTION_INTERVAL_SECONDS
+        except Exception as e:
+            print(f"Asset compaction failed: {e}")
+
+
+def _throttle():
+    if RETENTION_THROTTLE_SECONDS > 0:
+        time.sleep(RETENTION_THROTTLE_SECONDS)
+
+
+def _is_final_video_verified(project_dir: Path) -> bool:
+    video_path = project_dir / "final_video.mp4"
+    if not video_path.exists() or video_path.stat().st_size == 0:
+        return False
+    duration = get_video_duration(video_path)
+    return bool(duration and duration > 0)
+
+
+def compact_project(project_dir: Path) -> int:
+    assets_dir = project_dir / "assets"
+    if ASSET_RETENTION_POLICY == 'keep' or not assets_dir.exists():
+        return 0
+    if (assets_dir / COMPACTED_MARKER).exists():
+        return 0
+    if not _is_final_video_verified(project_dir):
+        print(f"Skipping compaction for {project_dir.name}: final video not verified")
+        return 0
+
+    size_before = get_folder_size(assets_dir)
+    renames = {}
+
+    with releasing_assets(assets_dir):
+        if ASSET_RETENTION_POLICY == 'drop':
+            shutil.rmtree(assets_dir, ignore_errors=True)
+            assets_dir.mkdir(exist_ok=True)
+        else:
+            for asset_path in sorted(assets_dir.iterdir()):
+                if not asset_path.is_file() or asset_path.name == COMPACTED_MARKER:
+                    continue
+                if asset_path.name.startswith(AI_IMAGE_PREFIXES) and asset_path.suffix.lower() in RAW_IMAGE_EXTENSIONS:
+                    compacted_path = _transcode_image(asset_path)
+                    if compacted_path:
+                        renames[f"assets/{asset_path.name}"] = f"assets/{compacted_path.name}"
+                else:
+                    asset_path.unlink(missing_ok=True)
+                _throttle()
+
+    timeline = Timeline.load(project_dir)
+    if timeline:
+        timeline.rename_assets(renames)
+        timeline.prune_missing(project_dir)
+        timeline.save(project_dir)
+
+    (assets_dir / COMPACTED_MARKER).touch()
+    freed = size_before - get_folder_size(assets_dir)
+    print(f"🗜️ Compacted assets for {project_dir.name}: freed {freed / (1024 * 1024):.1f} MB")
+    return freed
+
+
+def _transcode_image(image_path: Path) -> Optional[Path]:
+    image_format = 'WEBP' if RETENTION_IMAGE_FORMAT == 'webp' else 'JPEG'
+    target_path = image_path.with_suffix('.webp' if image_format == 'WEBP' else '.jpg')
+    if target_path == image_path:
+        target_path = image_path.with_name(f"{image_path.stem}_compact{image_path.suffix}")
+    tmp_path = target_path.with_name(f"{target_path.name}.tmp")
+
+    try:
+        with Image.open(image_path) as img:
+            img.convert("RGB").save(tmp_path, image_format, quality=RETENTION_IMAGE_QUALITY)
+        if tmp_path.stat().st_size < image_path.stat().st_size:
+            os.replace(tmp_path, target_path)
+            image_path.unlink()
+            return target_path
+        tmp_path.unlink()
+    except Exception as e:
+        print(f"Could not transcode {image_path.name}: {e}")
+        tmp_path.unlink(missing_ok=True)
+    return None
+
+
+def _completed_projects() -> List[Path]:
+    if not OUTPUT_DIR.exists():
+        return []
+    generating = load_generating_videos()
+    projects = [
+        project_dir for project_dir in OUTPUT_DIR.iterdir()
+        if project_dir.is_dir()
+        and project_dir.name not in generating
+        and (project_dir / "final_video.mp4").exists()
+    ]
+    return sorted(projects, key=lambda p: (p / "final_video.mp4").stat().st_mtime)
+
+
+def run_retention_sweep() -> dict:
+    projects = _completed_projects()
+    compacted, evicted = 0, []
+
+    for project_dir in projects:
+        if compact_project(project_dir):
+            compacted += 1
+
+    if RETENTION_MAX_AGE_DAYS > 0:
+        cutoff = time.time() - RETENTION_MAX_AGE_DAYS * 86400
+        for project_dir in list(projects):
+            if (project_dir / "final_video.mp4").stat().st_mtime < cutoff:
+                if delete_video_project(project_dir.name):
+                    evicted.append(project_dir.name)
+                projects.remove(project_dir)
+                _throttle()
+
+    if RETENTION_MAX_STORAGE_GB > 0:
+        max_bytes = RETENTION_MAX_STORAGE_GB * 1024 ** 3
+        seen_inodes = set()
+        total_size = sum(get_folder_size(p, seen_inodes) for p in OUTPUT_DIR.iterdir() if p.is_dir())
+        for project_dir in projects:
+            if total_size <= max_bytes:
+                break
+            project_size = get_folder_size(project_dir)
+            if delete_video_project(project_dir.name):
+                evicted.append(project_dir.name)
+                total_size -= project_size
+            _throttle()
+
+    if compacted or evicted:
+        print(f"🧹 Retention sweep: compacted {compacted} projects, evicted {len(evicted)}")
+
+    return {"compacted": compacted, "evicted": evicted}
@@ -1,9 +1,10 @@
+import json
 import re
-from typing import Dict
+from typing import Dict, Iterator, List, Optional, Tuple
 
-from client.openai_client import client
+from client.openai_client import chat_completion, stream_chat_completion
 
-from config import MAX_SCRIPT_RETRIES
+from config import MAX_SCRIPT_RETRIES, PACKAGE_IMAGE_PROMPT_COUNT
 from core.models import VideoSettings, ScriptGenerationError
 
 def generate_script(video_type: str, category: str, topic: str, video_settings: VideoSettings) -> str:
@@ -15,8 +16,8 @@ def generate_script(video_type: str, category: str, topic: str, video_settings:
     
     return _generate_standard_script(video_type, category, topic, video_settings)
 
-def _generate_country_script(country_name: str, topic: str, video_settings: VideoSettings) -> str:
-    prompt = f"""
+def _country_script_prompt(country_name: str, topic: str, video_settings: VideoSettings) -> str:
+    return f"""
 You are a helpful and insightful AI narrator for a YouTube video. Your task is to generate a script for the topic: "{topic}".
 
 IMPORTANT: Adopt a first-person AI persona. Use phrases like "As an AI, my analysis shows...", "From my perspective...", or "To an AI like me...". You are speaking directly about the country. Do NOT explain what artificial intelligence is or how you process data.
@@ -33,20 +34,23 @@ CRITICAL INSTRUCTIONS:
 - The tone must be conversational, engaging, and slightly awe-inspired, not robotic.
 - Write ONLY the spoken narration. Do NOT include visual directions, scene headings (like "Introduction:"), brackets like [intro music], or camera instructions.
 """
+
+def _generate_country_script(country_name: str, topic: str, video_settings: VideoSettings) -> str:
+    prompt = _country_script_prompt(country_name, topic, video_settings)
     
     try:
-        response = client.chat.completions.create(
+        script = chat_completion(
+            "script",
             model="gpt-4o",
             messages=[{"role": "user", "content": prompt}],
             temperature=0.7,
             max_tokens=1500
         )
-        script = response.choices[0].message.content.strip()
         return clean_script_for_voice(script)
     except Exception as e:
         raise ScriptGenerationError(f"Country-specific script generation failed: {e}")
 
-def _generate_standard_script(video_type: str, category: str, topic: str, video_settings: VideoSettings) -> str:
+def _standard_script_prompt(video_type: str, category: str, topic: str, video_settings: VideoSettings) -> Tuple[str, int]:
     if video_type == "shorts":
         max_tokens = 200
         prompt = f"""
@@ -91,21 +95,112 @@ Requirements:
 Write ONLY spoken narration. NO visual directions, NO brackets, NO camera instructions.
 Just pure narration text.
 """
+    return prompt, max_tokens
+
+def _generate_standard_script(video_type: str, category: str, topic: str, video_settings: VideoSettings) -> str:
+    prompt, max_tokens = _standard_script_prompt(video_type, category, topic, video_settings)
     
     for attempt in range(MAX_SCRIPT_RETRIES):
         try:
-            response = client.chat.completions.create(
+            script = chat_completion(
+                "script",
                 model="gpt-4",
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.7,
                 max_tokens=max_tokens
             )
-            script = response.choices[0].message.content.strip()
             return clean_script_for_voice(script)
         except Exception as e:
             if attempt == MAX_SCRIPT_RETRIES - 1:
                 raise ScriptGenerationError(f"Script generation failed after {MAX_SCRIPT_RETRIES} attempts: {e}")
 
+def stream_script_paragraphs(video_type: str, category: str, topic: str, video_settings: VideoSettings) -> Iterator[str]:
+    print(f"Streaming {video_type} script for: {topic}")
+
+    country_match = re.search(r'what does ai think about ([\w\s]+)\??$', topic, re.IGNORECASE)
+    if country_match and category == 'custom':
+        prompt, model, max_tokens = _country_script_prompt(country_match.group(1).title(), topic, video_settings), "gpt-4o", 1500
+    else:
+        prompt, max_tokens = _standard_script_prompt(video_type, category, topic, video_settings)
+        model = "gpt-4"
+
+    buffer = ""
+    emitted = 0
+    try:
+        for delta in stream_chat_completion("script", model=model, messages=[{"role": "user", "content": prompt}], temperature=0.7, max_tokens=max_tokens):
+            buffer += delta
+            *complete, buffer = re.split(r'\n\s*\n', buffer)
+            for paragraph in complete:
+                paragraph = clean_script_for_voice(paragraph)
+                if paragraph:
+                    emitted += 1
+                    yield paragraph
+    except Exception as e:
+        raise ScriptGenerationError(f"Streaming script generation failed after {emitted} paragraphs: {e}")
+
+    paragraph = clean_script_for_voice(buffer)
+    if paragraph:
+        yield paragraph
+
+def generate_content_package(video_type: str, category: str, topic: str, video_settings: VideoSettings) -> Optional[Dict]:
+    print(f"Generating structured content package for: {topic}")
+
+    country_match = re.search(r'what does ai think about ([\w\s]+)\??$', topic, re.IGNORECASE)
+    if country_match and category == 'custom':
+        script_prompt, max_tokens = _country_script_prompt(country_match.group(1).title(), topic, video_settings), 1500
+    else:
+        script_prompt, max_tokens = _standard_script_prompt(video_type, category, topic, video_settings)
+
+    prompt = f"""{script_prompt}
+In the same response, also prepare the production assets for this video.
+Respond with a single JSON object with exactly these fields:
+- "script": the narration described above, paragraphs separated by blank lines
+- "keywords": 15 stock footage search keywords (2-3 words each, tangible objects, actions and scenes, no abstract concepts)
+- "image_prompts": {PACKAGE_IMAGE_PROMPT_COUNT} image generation prompts that follow the narration in order (cinematic, high detail, no text)
+- "title": the video title (max 100 characters)
+- "description": an engaging description (2-4 sentences, with emojis, NO "subscribe" or "like" calls-to-action)
+- "tags": 10-15 relevant tags (no '#' symbol)
+"""
+
+    try:
+        content = chat_completion(
+            "package",
+            model="gpt-4o",
+            messages=[{"role": "user", "content": prompt}],
+            response_format={"type": "json_object"},
+            temperature=0.7,
+            max_tokens=max_tokens + 800
+        )
+        return _validate_content_package(json.loads(content), video_type, video_settings)
+    except Exception as e:
+        print(f"Structured content package failed: {e}, using per-step generation")
+        return None
+
+def _string_list(value, minimum: int) -> List[str]:
+    if not isinstance(value, list):
+        raise ValueError("expected a list")
+    items = [item.strip() for item in value if isinstance(item, str) and item.strip()]
+    if len(items) < minimum:
+        raise ValueError(f"expected at least {minimum} entries, got {len(items)}")
+    return items
+
+def _validate_content_package(data: Dict, video_type: str, video_settings: VideoSettings) -> Dict:
+    script = clean_script_for_voice(data.get("script") or "")
+    if len(script.split()) < video_settings.word_count_min * 0.6:
+        raise ValueError(f"script has only {len(script.split())} words")
+
+    title = (data.get("title") or "").strip()
+    description = (data.get("description") or "").strip()
+    if not title or not description:
+        raise ValueError("metadata is missing a title or description")
+
+    return {
+        "script": script,
+        "keywords": _string_list(data.get("keywords"), 5)[:15],
+        "image_prompts": _string_list(data.get("image_prompts"), 1),
+        "metadata": _build_metadata(title, description, _string_list(data.get("tags"), 1)[:15], video_type)
+    }
+
 def generate_youtube_metadata(topic: str, script: str, video_type: str) -> Dict:
     prompt = f"""
 You are an expert in writing viral YouTube video metadata.
@@ -121,11 +216,11 @@ The third part is a comma-separated list of 10-15 relevant keywords/tags (do NOT
 """
     
     try:
-        response = client.chat.completions.create(
+        content = chat_completion(
+            "metadata",
             model="gpt-4o",
             messages=[{"role": "user", "content": prompt}]
         )
-        content = response.choices[0].message.content.strip()
         parts = content.split('---')
 
         if len(parts) == 3:
@@ -137,15 +232,7 @@ The third part is a comma-separated list of 10-15 relevant keywords/tags (do NOT
                 raise ValueError("AI response contained empty parts")
 
             tags = [tag.strip() for tag in tags_list_str.split(',') if tag.strip()]
-            hashtags = ' '.join([f"#{tag.replace(' ', '')}" for tag in tags])
-            final_description = f"{desc_text}\n\n{hashtags}"
-
-            return {
-                "title": title,
-                "description": final_description,
-                "tags": tags,
-                "video_type": video_type
-            }
+            return _build_metadata(title, desc_text, tags, video_type)
         else:
             raise ValueError("AI response did not follow expected format")
 
@@ -153,6 +240,15 @@ The third part is a comma-separated list of 10-15 relevant keywords/tags (do NOT
         print(f"Primary metadata generation failed: {e}, using fallback")
         return _generate_metadata_fallback(topic, script, video_type)
 
+def _build_metadata(title: str, desc_text: str, tags: List[str], video_type: str) -> Dict:
+    hashtags = ' '.join([f"#{tag.replace(' ', '')}" for tag in tags])
+    return {
+        "title": title,
+        "description": f"{desc_text}\n\n{hashtags}",
+        "tags": tags,
+        "video_type": video_type
+    }
+
 def _generate_metadata_fallback(topic: str, script: str, video_type: str) -> Dict:
     return {
         "title": topic[:100],
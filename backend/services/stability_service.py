@@ -1,17 +1,101 @@
-import time
-import requests
-import random
+import asyncio
+import threading
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Optional
 import re
 
-from config import STABILITY_API_KEY, RETRY_ATTEMPTS
+import httpx
+import requests
+
+from client import http_client
+from client.circuit_breaker import CircuitBreaker
+from client.rate_limiter import AdaptiveRateLimiter
+from config import (
+    STABILITY_API_KEY, STABILITY_API_BASE, RETRY_ATTEMPTS, STABILITY_RATE_PER_SECOND, STABILITY_BURST, STABILITY_MIN_CONCURRENCY,
+    STABILITY_MAX_CONCURRENCY, STABILITY_INITIAL_CONCURRENCY, STABILITY_TARGET_LATENCY_SECONDS,
+    CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS, CIRCUIT_MAX_RESET_SECONDS, STABILITY_IMAGE_CACHE_MAX_BYTES
+)
+from repositories.asset_repository import link_asset
+from utils.disk_cache import DiskCache
+
+stability_limiter = AdaptiveRateLimiter(
+    "Stability API", STABILITY_RATE_PER_SECOND, STABILITY_BURST, STABILITY_MIN_CONCURRENCY,
+    STABILITY_MAX_CONCURRENCY, STABILITY_INITIAL_CONCURRENCY, STABILITY_TARGET_LATENCY_SECONDS
+)
+stability_breaker = CircuitBreaker("Stability API", CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS, CIRCUIT_MAX_RESET_SECONDS)
+_image_cache = DiskCache("stability_images", max_bytes=STABILITY_IMAGE_CACHE_MAX_BYTES)
+_job_stats_lock = threading.Lock()
+_job_stats: Dict[str, Dict[str, int]] = {}
+
+def _record_image_cache(job_id: str, hit: bool):
+    with _job_stats_lock:
+        stats = _job_stats.setdefault(job_id, {"hits": 0, "misses": 0})
+        stats["hits" if hit else "misses"] += 1
+
+def pop_image_cache_stats(job_id: str) -> Dict[str, int]:
+    with _job_stats_lock:
+        return _job_stats.pop(job_id, {"hits": 0, "misses": 0})
+
+def _image_cache_key(endpoint: str, data: Dict[str, Any]) -> str:
+    return DiskCache.make_key(endpoint, data)
+
+def _should_retry(status_code: int) -> bool:
+    return status_code in http_client.RETRY_STATUS_CODES
+
+async def _post_image_async(client: httpx.AsyncClient, endpoint: str, job_id: str, **kwargs) -> bytes:
+    for attempt in range(RETRY_ATTEMPTS):
+        stability_breaker.check()
+        try:
+            async with stability_limiter.async_slot(job_id) as permit:
+                stability_breaker.check_still_closed()
+                response = await http_client.async_request(client, "POST", endpoint, retries=0, **kwargs)
+                permit.observe(response)
+        except httpx.TransportError:
+            stability_breaker.record_failure()
+            if attempt == RETRY_ATTEMPTS - 1:
+                raise
+            continue
+
+        stability_breaker.record_status(response.status_code)
+        try:
+            response.raise_for_status()
+            return response.content
+        except httpx.HTTPStatusError as e:
+            if not _should_retry(e.response.status_code) or attempt == RETRY_ATTEMPTS - 1:
+                raise
+
+def _post_image(endpoint: str, job_id: str, **kwargs) -> bytes:
+    for attempt in range(RETRY_ATTEMPTS):
+        stability_breaker.check()
+        try:
+            with stability_limiter.slot(job_id) as permit:
+                stability_breaker.check_still_closed()
+                response = http_client.post(endpoint, retries=0, **kwargs)
+                permit.observe(response)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            stability_breaker.record_failure()
+            if attempt == RETRY_ATTEMPTS - 1:
+                raise
+            continue
+
+        stability_breaker.record_status(response.status_code)
+        try:
+            response.raise_for_status()
+            return response.content
+        except requests.exceptions.HTTPError as e:
+            if not _should_retry(e.response.status_code) or attempt == RETRY_ATTEMPTS - 1:
+                raise
 
-def generate_stability_image(prompt: str, index: int, project_dir: Path, style_preset: str) -> Optional[str]:
+def _store_image(key: str, content: bytes, filepath: Path):
+    cached_path = _image_cache.set_bytes(key, content, ".png")
+    if not link_asset(cached_path, filepath):
+        filepath.write_bytes(content)
+
+async def generate_stability_image(client: httpx.AsyncClient, prompt: str, index: int, project_dir: Path, style_preset: str, seed: int = 0) -> Optional[str]:
     if not STABILITY_API_KEY:
         return None
 
-    endpoint = "https://api.stability.ai/v2beta/stable-image/generate/sd3"
+    endpoint = f"{STABILITY_API_BASE}/v2beta/stable-image/generate/sd3"
     headers = {"authorization": f"Bearer {STABILITY_API_KEY}", "accept": "image/*"}
     data = {
         "prompt": prompt,
@@ -20,25 +104,24 @@ def generate_stability_image(prompt: str, index: int, project_dir: Path, style_p
         "model": "sd3.5-large",
         "style_preset": style_preset,
         "output_format": "png",
-        "seed": 0
+        "seed": seed
     }
 
-    for attempt in range(RETRY_ATTEMPTS):
-        try:
-            response = requests.post(endpoint, headers=headers, files={"none": ''}, data=data, timeout=45)
-            response.raise_for_status()
-            
-            filename = f"sd35_large_turbo_{index}_{random.randint(1000, 9999)}.png"
-            filepath = project_dir / "assets" / filename
-            filepath.write_bytes(response.content)
+    key = _image_cache_key(endpoint, data)
+    filepath = project_dir / "assets" / f"sd35_large_turbo_{index}_{key[:8]}.png"
+
+    try:
+        cached_path = await asyncio.to_thread(_image_cache.get_path, key, ".png")
+        _record_image_cache(project_dir.name, cached_path is not None)
+        if cached_path is not None and await asyncio.to_thread(link_asset, cached_path, filepath):
             return str(filepath)
-        except Exception as e:
-            if attempt == RETRY_ATTEMPTS - 1:
-                print(f"SD 3.5 Large Turbo failed for index {index}: {e}")
-                return None
-            time.sleep(2 * (attempt + 1))
-    
-    return None
+
+        content = await _post_image_async(client, endpoint, project_dir.name, headers=headers, files={"none": ''}, data=data, timeout=45)
+        await asyncio.to_thread(_store_image, key, content, filepath)
+        return str(filepath)
+    except Exception as e:
+        print(f"SD 3.5 Large Turbo failed for index {index}: {e}")
+        return None
 
 def generate_ai_thumbnail_image(topic: str, script: str, project_dir: Path, style_preset: str) -> Optional[str]:
     if not STABILITY_API_KEY:
@@ -59,7 +142,7 @@ def generate_ai_thumbnail_image(topic: str, script: str, project_dir: Path, styl
     Style: {style_preset}, dramatic lighting, professional photography, ultra-detailed.
     """
 
-    endpoint = "https://api.stability.ai/v2beta/stable-image/generate/ultra"
+    endpoint = f"{STABILITY_API_BASE}/v2beta/stable-image/generate/ultra"
     headers = {"authorization": f"Bearer {STABILITY_API_KEY}", "accept": "image/*"}
     data = {
         "prompt": prompt,
@@ -70,24 +153,18 @@ def generate_ai_thumbnail_image(topic: str, script: str, project_dir: Path, styl
         "seed": 0
     }
 
-    for attempt in range(RETRY_ATTEMPTS):
-        try:
-            if attempt > 0:
-                time.sleep(5 * attempt)
-            
-            response = requests.post(endpoint, headers=headers, files={"none": ''}, data=data, timeout=60)
-            response.raise_for_status()
-            
-            filepath = project_dir / "thumbnail.jpg"
-            filepath.write_bytes(response.content)
-            return str(filepath)
-            
-        except requests.exceptions.HTTPError as e:
-            if e.response.status_code in [429, 404] and attempt < RETRY_ATTEMPTS - 1:
-                continue
-            return None
-        except Exception:
-            if attempt == RETRY_ATTEMPTS - 1:
-                return None
-    
-    return None
\ No newline at end of file
+    key = _image_cache_key(endpoint, data)
+
+    try:
+        content = _image_cache.get_bytes(key, ".jpeg")
+        _record_image_cache(project_dir.name, content is not None)
+        if content is None:
+            content = _post_image(endpoint, project_dir.name, headers=headers, files={"none": ''}, data=data, timeout=60)
+            _image_cache.set_bytes(key, content, ".jpeg")
+
+        filepath = project_dir / "thumbnail.jpg"
+        filepath.write_bytes(content)
+        return str(filepath)
+    except Exception as e:
+        print(f"AI thumbnail generation failed: {e}")
+        return None
\ No newline at end of file
@@ -1,78 +1,213 @@
-import os
-import time
-import requests
-import concurrent.futures
+import asyncio
+import hashlib
+import httpx
+import imageio_ffmpeg
 from pathlib import Path
 from typing import List, Dict, Optional
 
-from config import PEXELS_API_KEY, MAX_DOWNLOAD_WORKERS
+from client import http_client
+from client.circuit_breaker import CircuitBreaker
+from config import (
+    PEXELS_API_KEY, PEXELS_API_BASE, PEXELS_SEARCH_CACHE_TTL, PEXELS_SEARCH_CACHE_MAX_BYTES, STOCK_MIN_VIDEO_WIDTH,
+    STOCK_PARTIAL_DOWNLOADS, STOCK_PARTIAL_MIN_RATIO, STOCK_TRIM_TIMEOUT_SECONDS,
+    CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS, CIRCUIT_MAX_RESET_SECONDS
+)
+from repositories.asset_repository import lookup_asset, new_temp_path, commit_asset, link_asset
+from utils.disk_cache import DiskCache
 
-def search_pexels(query: str, per_page: int = 5) -> List[Dict]:
-    headers = {"Authorization": PEXELS_API_KEY}
-    results = []
-    
-    try:
-        params = {"query": query, "per_page": per_page, "orientation": "landscape", "size": "medium"}
-        response = requests.get("https://api.pexels.com/videos/search", headers=headers, params=params, timeout=10)
-        response.raise_for_status()
-        for v in response.json().get("videos", []):
-            hd_file = next((f for f in v.get("video_files", []) if 1280 <= f.get("width", 0) <= 1920), None)
-            if hd_file and hd_file.get("link"):
-                results.append({"type": "video", "url": hd_file["link"], "id": f"pexels_v_{v['id']}"})
-    except Exception as e:
-        print(f"Pexels video search failed for '{query}': {e}")
-        
+PEXELS_VIDEO_SEARCH_URL = f"{PEXELS_API_BASE}/videos/search"
+PEXELS_PHOTO_SEARCH_URL = f"{PEXELS_API_BASE}/v1/search"
+
+_search_cache = DiskCache("pexels_search", ttl_seconds=PEXELS_SEARCH_CACHE_TTL, max_bytes=PEXELS_SEARCH_CACHE_MAX_BYTES)
+_inflight_searches: Dict[str, asyncio.Future] = {}
+_inflight_downloads: Dict[str, List] = {}
+pexels_breaker = CircuitBreaker("Pexels", CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS, CIRCUIT_MAX_RESET_SECONDS)
+media_breaker = CircuitBreaker("Pexels media", CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS, CIRCUIT_MAX_RESET_SECONDS)
+
+async def _fetch_pexels_search(client: httpx.AsyncClient, key: str, endpoint: str, params: Dict) -> Dict:
+    pexels_breaker.check()
     try:
-        params = {"query": query, "per_page": per_page, "orientation": "landscape"}
-        response = requests.get("https://api.pexels.com/v1/search", headers=headers, params=params, timeout=10)
-        response.raise_for_status()
-        for p in response.json().get("photos", []):
+        response = await http_client.async_request(client, "GET", endpoint, headers={"Authorization": PEXELS_API_KEY}, params=params, timeout=10)
+    except httpx.TransportError:
+        pexels_breaker.record_failure()
+        raise
+    pexels_breaker.record_status(response.status_code)
+    response.raise_for_status()
+    payload = response.json()
+    _search_cache.set_json(key, payload)
+    return payload
+
+async def _cached_pexels_search(client: httpx.AsyncClient, endpoint: str, query: str, per_page: int, orientation: str, extra_params: Optional[Dict] = None) -> Dict:
+    normalized_query = ' '.join(query.lower().split())
+    key = DiskCache.make_key(endpoint, normalized_query, per_page, orientation)
+
+    cached = _search_cache.get_json(key)
+    if cached is not None:
+        return cached
+
+    flight = _inflight_searches.get(key)
+    if flight is None:
+        params = {"query": normalized_query, "per_page": per_page, "orientation": orientation, **(extra_params or {})}
+        flight = asyncio.ensure_future(_fetch_pexels_search(client, key, endpoint, params))
+        _inflight_searches[key] = flight
+        flight.add_done_callback(lambda _: _inflight_searches.pop(key, None))
+
+    return await asyncio.shield(flight)
+
+def _select_rendition(video_files: List[Dict]) -> Optional[Dict]:
+    candidates = [
+        f for f in video_files
+        if f.get("link") and f.get("width", 0) >= STOCK_MIN_VIDEO_WIDTH and f.get("file_type", "video/mp4") == "video/mp4"
+    ]
+    if not candidates:
+        return None
+    return min(candidates, key=lambda f: (f.get("size") or f.get("width", 0) * f.get("height", 0), f.get("width", 0)))
+
+async def search_pexels(client: httpx.AsyncClient, query: str, per_page: int = 5) -> List[Dict]:
+    results = []
+    video_search, photo_search = await asyncio.gather(
+        _cached_pexels_search(client, PEXELS_VIDEO_SEARCH_URL, query, per_page, "landscape", {"size": "medium"}),
+        _cached_pexels_search(client, PEXELS_PHOTO_SEARCH_URL, query, per_page, "landscape"),
+        return_exceptions=True
+    )
+
+    if isinstance(video_search, Exception):
+        print(f"Pexels video search failed for '{query}': {video_search}")
+    else:
+        for v in video_search.get("videos", []):
+            rendition = _select_rendition(v.get("video_files", []))
+            if rendition:
+                results.append({
+                    "type": "video", "url": rendition["link"], "id": f"pexels_v_{v['id']}",
+                    "duration": v.get("duration") or 0
+                })
+
+    if isinstance(photo_search, Exception):
+        print(f"Pexels image search failed for '{query}': {photo_search}")
+    else:
+        for p in photo_search.get("photos", []):
             results.append({"type": "image", "url": p["src"]["large2x"], "id": f"pexels_i_{p['id']}"})
-    except Exception as e:
-        print(f"Pexels image search failed for '{query}': {e}")
         
     return results
 
-def download_asset(asset_info: tuple) -> Optional[str]:
-    index, asset, project_dir = asset_info
-    ext = "mp4" if asset["type"] == "video" else "jpg"
-    filename = f"asset_{index}_{asset['id']}.{ext}"
-    filepath = project_dir / "assets" / filename
-
-    if filepath.exists() and filepath.stat().st_size > 1000:
-        return str(filepath)
-
+async def _fetch_asset_blob(client: httpx.AsyncClient, asset: Dict, ext: str) -> Optional[Path]:
     for attempt in range(3):
+        if not media_breaker.allow():
+            return None
+        tmp_path = new_temp_path(ext)
         try:
-            response = requests.get(asset["url"], stream=True, timeout=15, headers={'User-Agent': 'Mozilla/5.0'})
-            response.raise_for_status()
-            with open(filepath, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
+            digest = hashlib.sha256()
+            async with http_client.async_stream(client, "GET", asset["url"], retries=0, timeout=15, headers={'User-Agent': 'Mozilla/5.0'}) as response:
+                if response.status_code >= 500:
+                    media_breaker.record_failure()
+                response.raise_for_status()
+                with open(tmp_path, 'wb') as f:
+                    async for chunk in response.aiter_bytes(65536):
                         f.write(chunk)
+                        digest.update(chunk)
             
-            if filepath.stat().st_size > 1000:
-                return str(filepath)
+            media_breaker.record_success()
+            if tmp_path.stat().st_size > 1000:
+                return await asyncio.to_thread(commit_asset, asset["id"], tmp_path, digest.hexdigest(), ext)
             else:
-                filepath.unlink()
                 return None
-        except requests.exceptions.RequestException:
+        except httpx.HTTPError as e:
+            if isinstance(e, httpx.TransportError):
+                media_breaker.record_failure()
             if attempt < 2:
-                time.sleep(0.5)
+                await asyncio.sleep(http_client.backoff_delay(attempt, getattr(e, 'response', None)))
             else:
                 return None
+        finally:
+            tmp_path.unlink(missing_ok=True)
     return None
 
-def download_assets_parallel(assets: List[Dict], project_dir: Path) -> List[str]:
-    downloaded_paths = []
-    asset_tuples = [(i, asset, project_dir) for i, asset in enumerate(assets)]
-    
-    with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_DOWNLOAD_WORKERS) as executor:
-        future_to_asset = {executor.submit(download_asset, asset_tuple): asset_tuple for asset_tuple in asset_tuples}
-        for future in concurrent.futures.as_completed(future_to_asset):
-            result = future.result()
-            if result:
-                downloaded_paths.append(result)
-                print(f"✓ Downloaded: {os.path.basename(result)}")
-                
-    return downloaded_paths
\ No newline at end of file
+def _hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+async def _fetch_video_window(asset: Dict, store_id: str, window: float) -> Optional[Path]:
+    start = max(0.0, (asset["duration"] - window) / 2)
+    tmp_path = new_temp_path("mp4")
+    command = [
+        imageio_ffmpeg.get_ffmpeg_exe(), "-nostdin", "-loglevel", "error", "-y",
+        "-user_agent", "Mozilla/5.0", "-rw_timeout", "15000000", "-ss", f"{start:.2f}", "-i", asset["url"], "-t", f"{window:.2f}",
+        "-map", "0:v:0", "-c", "copy", "-an", "-movflags", "+faststart", "-f", "mp4", str(tmp_path)
+    ]
+    process = None
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *command, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE
+        )
+        _, stderr = await asyncio.wait_for(process.communicate(), STOCK_TRIM_TIMEOUT_SECONDS)
+        if process.returncode != 0 or tmp_path.stat().st_size <= 1000:
+            print(f"Partial download failed for {asset['id']}: {stderr.decode(errors='ignore').strip()[:200]}")
+            return None
+        content_hash = await asyncio.to_thread(_hash_file, tmp_path)
+        return await asyncio.to_thread(commit_asset, store_id, tmp_path, content_hash, "mp4")
+    except (asyncio.TimeoutError, OSError) as e:
+        print(f"Partial download failed for {asset['id']}: {e}")
+        return None
+    finally:
+        if process and process.returncode is None:
+            process.kill()
+            await process.wait()
+        tmp_path.unlink(missing_ok=True)
+
+async def _fetch_video_clip(client: httpx.AsyncClient, asset: Dict, store_id: str, window: float) -> Optional[Path]:
+    blob_path = await _fetch_video_window(asset, store_id, window)
+    if blob_path is None:
+        blob_path = await _fetch_asset_blob(client, asset, "mp4")
+    return blob_path
+
+async def _shared_download(key: str, fetch) -> Optional[Path]:
+    entry = _inflight_downloads.get(key)
+    if entry is None:
+        entry = [asyncio.ensure_future(fetch()), 0]
+        _inflight_downloads[key] = entry
+
+    def forget(_=None):
+        if _inflight_downloads.get(key) is entry:
+            del _inflight_downloads[key]
+
+    entry[0].add_done_callback(forget)
+    entry[1] += 1
+    try:
+        return await asyncio.shield(entry[0])
+    finally:
+        entry[1] -= 1
+        if entry[1] == 0 and not entry[0].done():
+            entry[0].cancel()
+            forget()
+            await asyncio.gather(entry[0], return_exceptions=True)
+
+async def download_asset(client: httpx.AsyncClient, index: int, asset: Dict, project_dir: Path, window: Optional[float] = None) -> Optional[str]:
+    ext = "mp4" if asset["type"] == "video" else "jpg"
+    filename = f"asset_{index}_{asset['id']}.{ext}"
+    filepath = project_dir / "assets" / filename
+
+    if filepath.exists() and filepath.stat().st_size > 1000:
+        return str(filepath)
+
+    partial = (
+        STOCK_PARTIAL_DOWNLOADS and window and asset["type"] == "video"
+        and asset.get("duration", 0) > window * STOCK_PARTIAL_MIN_RATIO
+    )
+    store_id = f"{asset['id']}_{window:g}s" if partial else asset["id"]
+
+    blob_path = lookup_asset(store_id, ext) or lookup_asset(asset["id"], ext)
+    if blob_path is None:
+        if media_breaker.is_open():
+            return None
+        if partial:
+            fetch = lambda: _fetch_video_clip(client, asset, store_id, window)
+        else:
+            fetch = lambda: _fetch_asset_blob(client, asset, ext)
+        blob_path = await _shared_download(f"{store_id}.{ext}", fetch)
+
+    if blob_path and await asyncio.to_thread(link_asset, blob_path, filepath):
+        return str(filepath)
+    return None
@@ -0,0 +1,173 @@
+import json
+import os
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from moviepy import AudioFileClip
+
+from config import INTRO_CLIPS_COUNT, INTRO_CLIP_DURATION, TIMELINE_SNAP_TOLERANCE
+from core.models import VideoSettings
+from services.audio_service import load_timing_map
+
+TIMELINE_FILENAME = "timeline.json"
+TIMELINE_VERSION = 1
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.avi')
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp')
+
+
+class Timeline:
+    def __init__(self, duration: float, starts: List[float], ends: List[float],
+                 assets: Optional[List[str]] = None, sources: Optional[List[int]] = None,
+                 in_points: Optional[List[float]] = None):
+        self.duration = duration
+        self.starts = array('d', starts)
+        self.ends = array('d', ends)
+        self.assets: List[str] = list(assets or [])
+        self.sources = array('i', sources if sources is not None else [-1] * len(self.starts))
+        self.in_points = array('d', in_points if in_points is not None else [-1.0] * len(self.starts))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def slot(self, index: int) -> Tuple[float, float]:
+        return self.starts[index], self.ends[index]
+
+    def slot_at(self, t: float) -> int:
+        return max(0, min(len(self) - 1, bisect_right(self.starts, t) - 1))
+
+    def longest_slot(self) -> float:
+        return max((end - start for start, end in zip(self.starts, self.ends)), default=0.0)
+
+    def fit_to(self, duration: float):
+        while len(self) > 1 and self.starts[-1] >= duration - 0.05:
+            for column in (self.starts, self.ends, self.sources, self.in_points):
+                column.pop()
+        if len(self):
+            self.ends[-1] = duration
+        self.duration = duration
+
+    def assign(self, asset_paths: List[str], project_dir: Path):
+        ordered = [a for a in asset_paths if a and os.path.exists(a)]
+        self.assets = [_relative_ref(path, project_dir) for path in ordered]
+        for index in range(len(self)):
+            self.sources[index] = index % len(self.assets) if self.assets else -1
+            self.in_points[index] = -1.0
+
+    def set_source(self, index: int, asset_path: str, project_dir: Path, in_point: float = 0.0):
+        ref = _relative_ref(asset_path, project_dir)
+        if ref not in self.assets:
+            self.assets.append(ref)
+        self.sources[index] = self.assets.index(ref)
+        self.in_points[index] = in_point
+
+    def asset_path(self, index: int, project_dir: Path) -> Optional[str]:
+        source = self.sources[index]
+        return str(project_dir / self.assets[source]) if 0 <= source < len(self.assets) else None
+
+    def asset_paths(self, project_dir: Path) -> List[str]:
+        return [str(project_dir / ref) for ref in self.assets]
+
+    def rename_assets(self, renames: Dict[str, str]):
+        self.assets = [renames.get(ref, ref) for ref in self.assets]
+
+    def prune_missing(self, project_dir: Path) -> int:
+        kept = [ref for ref in self.assets if (project_dir / ref).exists()]
+        if len(kept) == len(self.assets):
+            return 0
+        remap = {old: kept.index(ref) for old, ref in enumerate(self.assets) if ref in kept}
+        for index in range(len(self)):
+            source = remap.get(self.sources[index], -1)
+            if source < 0:
+                self.in_points[index] = -1.0
+            self.sources[index] = source
+        removed = len(self.assets) - len(kept)
+        self.assets = kept
+        return removed
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": TIMELINE_VERSION,
+            "duration": round(self.duration, 3),
+            "assets": self.assets,
+            "starts": [round(value, 3) for value in self.starts],
+            "ends": [round(value, 3) for value in self.ends],
+            "sources": self.sources.tolist(),
+            "in_points": [round(value, 3) for value in self.in_points],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Timeline":
+        return cls(data["duration"], data["starts"], data["ends"], data.get("assets"), data.get("sources"), data.get("in_points"))
+
+    def save(self, project_dir: Path):
+        path = project_dir / TIMELINE_FILENAME
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        tmp_path.write_text(json.dumps(self.to_dict(), separators=(',', ':')))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, project_dir: Path) -> Optional["Timeline"]:
+        try:
+            data = json.loads((project_dir / TIMELINE_FILENAME).read_text())
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != TIMELINE_VERSION:
+            return None
+        try:
+            return cls.from_dict(data)
+        except (KeyError, TypeError, ValueError):
+            return None
+
+
+def _relative_ref(asset_path: str, project_dir: Path) -> str:
+    path = Path(asset_path)
+    try:
+        return path.resolve().relative_to(project_dir.resolve()).as_posix()
+    except ValueError:
+        return str(path)
+
+
+def _audio_duration(audio_path: str) -> float:
+    try:
+        with AudioFileClip(str(audio_path)) as audio:
+            return audio.duration
+    except Exception:
+        return 30.0
+
+
+def _snap_to_pause(ideal: float, target: float, cut_points: List[float]) -> float:
+    low, high = ideal - target * TIMELINE_SNAP_TOLERANCE, ideal + target * TIMELINE_SNAP_TOLERANCE
+    candidates = [point for point in cut_points if low <= point <= high]
+    return min(candidates, key=lambda point: abs(point - ideal)) if candidates else ideal
+
+
+def plan_clip_schedule(audio_path: str, video_settings: VideoSettings) -> List[Tuple[float, float]]:
+    timing = load_timing_map(audio_path)
+    if timing:
+        total_duration = timing["duration"]
+        cut_points = [round((start + end) / 2, 3) for start, end in timing.get("pauses", [])]
+    else:
+        total_duration = _audio_duration(audio_path)
+        cut_points = []
+
+    schedule = []
+    current_time = 0.0
+    while total_duration - current_time > 0.05:
+        target = INTRO_CLIP_DURATION if len(schedule) < INTRO_CLIPS_COUNT else video_settings.clip_duration
+        if total_duration - current_time < target * 1.5:
+            end = total_duration
+        else:
+            end = _snap_to_pause(current_time + target, target, cut_points)
+        schedule.append((round(current_time, 3), round(end, 3)))
+        current_time = end
+
+    return schedule
+
+
+def build_timeline(audio_path: str, video_settings: VideoSettings) -> Timeline:
+    schedule = plan_clip_schedule(audio_path, video_settings)
+    duration = schedule[-1][1] if schedule else 0.0
+    return Timeline(duration, [start for start, _ in schedule], [end for _, end in schedule])
+
@@ -0,0 +1,70 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+from client.rate_limiter import AdaptiveRateLimiter
+
+
+def _limiter(rate: float = 5.0) -> AdaptiveRateLimiter:
+    return AdaptiveRateLimiter("test", rate, 1, 1, 1, 1, 10.0)
+
+
+def _run_slots(limiter: AdaptiveRateLimiter, job_ids, work=None):
+    finished = []
+
+    def user(job_id):
+        with limiter.slot(job_id) as permit:
+            if work:
+                work(job_id, permit)
+        finished.append((job_id, time.monotonic()))
+
+    threads = [threading.Thread(target=user, args=(job_id,), daemon=True) for job_id in job_ids]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.02)
+    for thread in threads:
+        thread.join(timeout=5)
+    return finished
+
+
+def test_waiters_are_woken_after_tokens_run_out():
+    limiter = _limiter(rate=5.0)
+    finished = _run_slots(limiter, ["a", "b", "c"])
+
+    assert len(finished) == 3
+    stats = limiter.stats()
+    assert stats["waiting"] == 0 and stats["inflight"] == 0
+
+
+def test_waiters_are_woken_after_throttle_pause():
+    limiter = _limiter(rate=100.0)
+    throttled = SimpleNamespace(status_code=429, headers={"Retry-After": "1"})
+    released_at = {}
+
+    def work(job_id, permit):
+        if job_id == "a":
+            time.sleep(0.1)
+            permit.observe(throttled)
+            released_at["a"] = time.monotonic()
+
+    finished = dict(_run_slots(limiter, ["a", "b"], work))
+
+    assert set(finished) == {"a", "b"}
+    assert 0.9 <= finished["b"] - released_at["a"] < 2.0
+    assert limiter.stats()["throttled"] == 1
+
+
+def test_async_waiters_are_woken_after_tokens_run_out():
+    limiter = _limiter(rate=5.0)
+
+    async def user(job_id):
+        async with limiter.async_slot(job_id):
+            await asyncio.sleep(0)
+        return job_id
+
+    async def main():
+        return await asyncio.wait_for(asyncio.gather(*(user(job_id) for job_id in ["a", "b", "c"])), 5)
+
+    assert asyncio.run(main()) == ["a", "b", "c"]
+    assert limiter.stats()["waiting"] == 0
@@ -0,0 +1,56 @@
+import time
+import zipfile
+from pathlib import Path
+from typing import Iterable, Iterator, Tuple, Union
+
+ARCHIVE_CHUNK_SIZE = 1024 * 1024
+ZIP64_THRESHOLD = 0x7FFFFFFF
+STORED_EXTENSIONS = ('.mp4', '.mov', '.m4a', '.mp3', '.jpg', '.jpeg', '.png', '.webp')
+
+
+class _StreamBuffer:
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _compress_type_for(arcname: str) -> int:
+    if arcname.lower().endswith(STORED_EXTENSIONS):
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+def stream_zip(entries: Iterable[Tuple[str, Union[Path, bytes]]]) -> Iterator[bytes]:
+    buffer = _StreamBuffer()
+
+    with zipfile.ZipFile(buffer, mode='w', allowZip64=True) as archive:
+        for arcname, source in entries:
+            if isinstance(source, bytes):
+                info = zipfile.ZipInfo(arcname, date_time=time.localtime()[:6])
+                info.compress_type = _compress_type_for(arcname)
+                archive.writestr(info, source)
+            else:
+                info = zipfile.ZipInfo.from_file(source, arcname)
+                info.compress_type = _compress_type_for(arcname)
+                force_zip64 = info.file_size > ZIP64_THRESHOLD
+                with open(source, 'rb') as src, archive.open(info, 'w', force_zip64=force_zip64) as dest:
+                    while True:
+                        chunk = src.read(ARCHIVE_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        dest.write(chunk)
+                        yield buffer.drain()
+            yield buffer.drain()
+
+    yield buffer.drain()
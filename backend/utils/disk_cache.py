@@ -0,0 +1,255 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from config import CACHE_DIR
+
+
+class DiskCache:
+    _registry: Dict[str, "DiskCache"] = {}
+
+    def __init__(self, namespace: str, ttl_seconds: Optional[float] = None, max_bytes: Optional[int] = None):
+        self.namespace = namespace
+        self.directory = CACHE_DIR / namespace
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._approx_bytes = None
+        DiskCache._registry[namespace] = self
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str, suffix: str = "") -> Path:
+        return self.directory / key[:2] / f"{key}{suffix}"
+
+    def _record(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get_path(self, key: str, suffix: str = "") -> Optional[Path]:
+        path = self._path(key, suffix)
+        try:
+            st = path.stat()
+        except OSError:
+            self._record(False)
+            return None
+
+        now = time.time()
+        if self.ttl_seconds is not None and now - st.st_mtime > self.ttl_seconds:
+            path.unlink(missing_ok=True)
+            self._record(False)
+            return None
+
+        try:
+            os.utime(path, (now, st.st_mtime))
+        except OSError:
+            pass
+        self._record(True)
+        return path
+
+    def get_bytes(self, key: str, suffix: str = "") -> Optional[bytes]:
+        path = self.get_path(key, suffix)
+        if path is None:
+            return None
+        try:
+            return path.read_bytes()
+        except OSError:
+            return None
+
+    def get_json(self, key: str) -> Optional[Any]:
+        data = self.get_bytes(key, ".json")
+        if data is None:
+            return None
+        try:
+            return json.loads(data)
+        except ValueError:
+            return None
+
+    def _write(self, key: str, suffix: str, writer: Callable[[Path], None]) -> Path:
+        path = self._path(key, suffix)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=f".{key[:8]}.", suffix=".tmp")
+        os.close(fd)
+        try:
+            writer(Path(tmp_path))
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        with self._lock:
+            if self._approx_bytes is not None:
+                self._approx_bytes += size
+        self._maybe_evict()
+        return path
+
+    def set_bytes(self, key: str, data: bytes, suffix: str = "") -> Path:
+        return self._write(key, suffix, lambda tmp: tmp.write_bytes(data))
+
+    def set_json(self, key: str, value: Any) -> Path:
+        data = json.dumps(value, ensure_ascii=False).encode('utf-8')
+        return self.set_bytes(key, data, ".json")
+
+    def put_file(self, key: str, source: Path, suffix: str = "") -> Path:
+        return self._write(key, suffix, lambda tmp: shutil.copyfile(source, tmp))
+
+    def put_generated(self, key: str, writer: Callable[[Path], None], suffix: str = "") -> Path:
+        return self._write(key, suffix, writer)
+
+    def _maybe_evict(self):
+        if not self.max_bytes:
+            return
+
+        with self._lock:
+            if self._approx_bytes is not None and self._approx_bytes <= self.max_bytes:
+                return
+
+            entries = []
+            for path in self.directory.glob("*/*"):
+                if path.name.startswith('.'):
+                    continue
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_atime, st.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            target = self.max_bytes * 0.9
+            if total > self.max_bytes:
+                for _, size, path in sorted(entries, key=lambda e: e[0]):
+                    if total <= target:
+                        break
+                    path.unlink(missing_ok=True)
+                    total -= size
+            self._approx_bytes = total
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "size_bytes": self._approx_bytes,
+            }
+
+    @classmethod
+    def all_stats(cls) -> Dict[str, Dict[str, Any]]:
+        return {name: cache.stats() for name, cache in cls._registry.items()}
+
+
+class SingleFlight:
+    class _Call:
+        def __init__(self):
+            self.event = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, "SingleFlight._Call"] = {}
+
+    def do(self, key: str, func: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = SingleFlight._Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+
+class StaleWhileRevalidate:
+    def __init__(self, namespace: str, fresh_seconds: float, retry_seconds: float):
+        self.fresh_seconds = fresh_seconds
+        self.retry_seconds = retry_seconds
+        self._store = DiskCache(namespace)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._refreshing: Dict[str, threading.Event] = {}
+        self._failed_at: Dict[str, float] = {}
+
+    def _entry(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            entry = self._store.get_json(DiskCache.make_key(key))
+            if entry is not None:
+                with self._lock:
+                    entry = self._entries.setdefault(key, entry)
+        return entry
+
+    def _refresh(self, key: str, fetch: Callable[[], Any]):
+        try:
+            value = fetch()
+        except Exception as e:
+            print(f"Background refresh of '{key}' failed: {e}")
+            with self._lock:
+                self._failed_at[key] = time.time()
+        else:
+            entry = {"value": value, "fetched_at": time.time()}
+            with self._lock:
+                self._entries[key] = entry
+                self._failed_at.pop(key, None)
+            try:
+                self._store.set_json(DiskCache.make_key(key), entry)
+            except OSError as e:
+                print(f"Could not persist '{key}': {e}")
+        finally:
+            with self._lock:
+                done = self._refreshing.pop(key)
+            done.set()
+
+    def _schedule(self, key: str, fetch: Callable[[], Any]) -> Optional[threading.Event]:
+        with self._lock:
+            done = self._refreshing.get(key)
+            if done is not None:
+                return done
+            if time.time() - self._failed_at.get(key, 0.0) < self.retry_seconds:
+                return None
+            done = self._refreshing[key] = threading.Event()
+        threading.Thread(target=self._refresh, args=(key, fetch), name=f"refresh-{key}", daemon=True).start()
+        return done
+
+    def get(self, key: str, fetch: Callable[[], Any], wait_seconds: float = 0.0) -> Optional[Any]:
+        entry = self._entry(key)
+        if entry is not None and time.time() - entry["fetched_at"] < self.fresh_seconds:
+            return entry["value"]
+
+        done = self._schedule(key, fetch)
+        if entry is None and done is not None and wait_seconds > 0:
+            done.wait(wait_seconds)
+            entry = self._entry(key)
+        return entry["value"] if entry is not None else None
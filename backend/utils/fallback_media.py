@@ -0,0 +1,99 @@
+import io
+import subprocess
+from pathlib import Path
+from typing import Tuple
+
+import imageio_ffmpeg
+import numpy as np
+from PIL import Image
+
+from config import FPS, FALLBACK_CLIP_SECONDS
+from utils.disk_cache import DiskCache, SingleFlight
+
+FALLBACK_PALETTES = [
+    ((20, 20, 50), (50, 50, 100)),
+    ((50, 20, 20), (100, 50, 50)),
+    ((20, 50, 20), (50, 100, 50)),
+]
+FALLBACK_VARIANTS = ('still', 'pan', 'zoom')
+PAN_OVERSCAN = 1.25
+ZOOM_MAX_SCALE = 1.15
+
+_fallback_cache = DiskCache("fallback_media")
+_fallback_flight = SingleFlight()
+
+
+def _vertical_gradient(palette: Tuple, width: int, height: int) -> np.ndarray:
+    start_color, end_color = (np.array(color, dtype=np.float32) for color in palette)
+    ratio = (np.arange(height, dtype=np.float32) / height)[:, None]
+    rows = (start_color * (1 - ratio) + end_color * ratio).astype(np.uint8)
+    return np.ascontiguousarray(np.broadcast_to(rows[:, None, :], (height, width, 3)))
+
+
+def _lit_gradient(palette: Tuple, width: int, height: int) -> np.ndarray:
+    start_color, end_color = (np.array(color, dtype=np.float32) for color in palette)
+    ys = np.linspace(0.0, 1.0, height, dtype=np.float32)[:, None]
+    xs = np.linspace(0.0, 1.0, width, dtype=np.float32)[None, :]
+    ratio = (0.7 * ys + 0.3 * xs)[..., None]
+    light = 1.25 - 0.45 * np.sqrt((xs - 0.5) ** 2 + (ys - 0.5) ** 2)[..., None]
+    return np.clip((start_color * (1 - ratio) + end_color * ratio) * light, 0, 255).astype(np.uint8)
+
+
+def _ping_pong(frame_count: int) -> np.ndarray:
+    phase = np.arange(frame_count, dtype=np.float32) / frame_count
+    return 1 - np.abs(2 * phase - 1)
+
+
+def _frames(palette: Tuple, width: int, height: int, variant: str):
+    positions = _ping_pong(max(2, int(FALLBACK_CLIP_SECONDS * FPS)))
+    if variant == 'pan':
+        canvas = _lit_gradient(palette, int(width * PAN_OVERSCAN), height)
+        for offset in (positions * (canvas.shape[1] - width)).astype(np.int64):
+            yield canvas[:, offset:offset + width]
+    else:
+        base = _lit_gradient(palette, width, height)
+        row_offsets = np.arange(height, dtype=np.float32) - height / 2
+        col_offsets = np.arange(width, dtype=np.float32) - width / 2
+        for scale in 1 + positions * (ZOOM_MAX_SCALE - 1):
+            rows = np.clip(row_offsets / scale + height / 2, 0, height - 1).astype(np.int64)
+            cols = np.clip(col_offsets / scale + width / 2, 0, width - 1).astype(np.int64)
+            yield base.take(rows, axis=0).take(cols, axis=1)
+
+
+def _encode_clip(palette: Tuple, width: int, height: int, variant: str, output_path: Path):
+    process = subprocess.Popen(
+        [imageio_ffmpeg.get_ffmpeg_exe(), "-nostdin", "-loglevel", "error", "-y",
+         "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{width}x{height}", "-r", str(FPS), "-i", "-",
+         "-c:v", "libx264", "-preset", "veryfast", "-crf", "23", "-pix_fmt", "yuv420p",
+         "-movflags", "+faststart", "-f", "mp4", str(output_path)],
+        stdin=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    try:
+        for frame in _frames(palette, width, height, variant):
+            process.stdin.write(np.ascontiguousarray(frame).tobytes())
+        process.stdin.close()
+    except BrokenPipeError:
+        pass
+    stderr = process.stderr.read()
+    if process.wait() != 0:
+        raise RuntimeError(f"ffmpeg failed encoding {variant} fallback clip: {stderr.decode(errors='ignore').strip()}")
+
+
+def fallback_media_path(palette_index: int, size: Tuple[int, int], variant: str = 'still') -> Path:
+    palette = FALLBACK_PALETTES[palette_index % len(FALLBACK_PALETTES)]
+    variant = variant if variant in FALLBACK_VARIANTS else 'still'
+    width, height = size
+    suffix = ".jpg" if variant == 'still' else ".mp4"
+    key = DiskCache.make_key(palette, width, height, variant, FPS if variant != 'still' else None, FALLBACK_CLIP_SECONDS if variant != 'still' else None)
+
+    def build() -> Path:
+        cached = _fallback_cache.get_path(key, suffix)
+        if cached is not None:
+            return cached
+        if variant == 'still':
+            buffer = io.BytesIO()
+            Image.fromarray(_vertical_gradient(palette, width, height)).save(buffer, "JPEG", quality=90)
+            return _fallback_cache.set_bytes(key, buffer.getvalue(), suffix)
+        return _fallback_cache.put_generated(key, lambda tmp: _encode_clip(palette, width, height, variant, tmp), suffix)
+
+    return _fallback_flight.do(key, build)
@@ -1,6 +1,6 @@
 from typing import List
 import re
-from client.openai_client import client
+from client.openai_client import chat_completion
 
 def generate_smart_keywords(topic: str, script: str) -> List[str]:
     prompt = f"""
@@ -22,13 +22,13 @@ def generate_smart_keywords(topic: str, script: str) -> List[str]:
     Return ONLY a comma-separated list of keywords.
     """
     try:
-        response = client.chat.completions.create(
+        text = chat_completion(
+            "keywords",
             model="gpt-3.5-turbo",
             messages=[{"role": "user", "content": prompt}],
             temperature=0.7,
             max_tokens=150
         )
-        text = (response.choices[0].message.content or "").strip()
         keywords = text.split(',')
         return [k.strip() for k in keywords][:15]
     except:
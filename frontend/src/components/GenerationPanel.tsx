@@ -61,9 +61,8 @@ export const GenerationPanel: React.FC<Props> = ({
   const testVoice = async () => {
     setTestingVoice(true);
     try {
-      const data = await api.testVoice(selectedVoice, videoType);
-      const audio = new Audio(`data:audio/mp3;base64,${data.audio_base64}`);
-      audio.play();
+      const audio = new Audio(api.getVoiceTestUrl(selectedVoice, videoType));
+      await audio.play();
       showNotification('🔊 Voice test played successfully!', 'success');
     } catch (error) {
       showNotification('Failed to test voice', 'error');
@@ -27,12 +27,9 @@ class ApiService {
     return this.fetch<{ voices: Voice[] }>('/api/voices');
   }
 
-  async testVoice(voiceId: string, videoType: string): Promise<{ audio_base64: string }> {
-    return this.fetch('/api/test-voice', {
-      method: 'POST',
-      headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({ voice_id: voiceId, video_type: videoType })
-    });
+  getVoiceTestUrl(voiceId: string, videoType: string): string {
+    const params = new URLSearchParams({ voice_id: voiceId, video_type: videoType });
+    return `${API_URL}/api/test-voice?${params}`;
   }
 
   async generateVideo(request: GenerateVideoRequest): Promise<{ progress_id: string; video_type: string }> {